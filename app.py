@@ -5,8 +5,10 @@ import io
 from pathlib import Path
 import base64
 from clone_voice import VoiceCloner, setup_openvoice_models
-from translate_text import TextTranslator
+from translate_text import TranslationRouter
 from utils import validate_audio_file, get_audio_info, preprocess_voice_samples
+from model_registry import registry, ModelLease
+from config import UI_CONFIG, SPEAKER_STORE_CONFIG
 import torch
 
 # Page configuration
@@ -59,10 +61,17 @@ st.markdown("""
 
 def init_session_state():
     """Initialize session state variables"""
-    if 'voice_cloner' not in st.session_state:
-        st.session_state.voice_cloner = VoiceCloner()
-    if 'translator' not in st.session_state:
-        st.session_state.translator = TextTranslator()
+    # Models are shared by every session in the process; only references live here
+    if 'model_lease' not in st.session_state:
+        st.session_state.voice_cloner = registry.acquire('voice_cloner', VoiceCloner)
+        st.session_state.translator = registry.acquire('translator', TranslationRouter)
+        st.session_state.model_lease = ModelLease(registry, ['voice_cloner', 'translator'])
+    if 'speaker_id' not in st.session_state:
+        st.session_state.speaker_id = SPEAKER_STORE_CONFIG['default_speaker_id']
+    if 'speaker_embedding' not in st.session_state:
+        st.session_state.speaker_embedding = None
+    if 'retraining' not in st.session_state:
+        st.session_state.retraining = False
     if 'speaker_trained' not in st.session_state:
         st.session_state.speaker_trained = False
     if 'models_loaded' not in st.session_state:
@@ -94,7 +103,14 @@ def display_system_info():
         st.sidebar.success("✅ Translation model loaded")
     else:
         st.sidebar.warning("⏳ Translation model not loaded")
-    
+
+    # Idle or over-budget translation models are unloaded and reload on demand
+    pool = getattr(st.session_state.translator, 'pool', None)
+    if pool is not None:
+        for name, info in pool.report()['models'].items():
+            if info['resident']:
+                st.sidebar.caption(f"🧠 {name}: {info['memory_mb']:.0f} MB resident")
+
     if st.session_state.speaker_trained:
         st.sidebar.success("✅ Voice model trained")
     else:
@@ -104,7 +120,7 @@ def load_models():
     """Load translation models"""
     if not st.session_state.models_loaded:
         with st.spinner("Loading translation models... This may take a few minutes."):
-            success = st.session_state.translator.load_model()
+            success = registry.ensure_loaded('translator')
             if success:
                 st.session_state.models_loaded = True
                 st.success("Translation model loaded successfully!")
@@ -117,15 +133,63 @@ def voice_cloning_section():
     """Voice cloning section of the app"""
     st.markdown('<div class="sub-header">🎤 Voice Cloning</div>', unsafe_allow_html=True)
     
+    # Every voice profile is stored separately, so users do not overwrite each other
+    speaker_id = st.text_input(
+        "Voice profile name:",
+        value=st.session_state.speaker_id,
+        help="Your voice model is saved under this name"
+    ).strip() or SPEAKER_STORE_CONFIG['default_speaker_id']
+    if speaker_id != st.session_state.speaker_id:
+        st.session_state.speaker_id = speaker_id
+        st.session_state.speaker_embedding = None
+        st.session_state.speaker_trained = False
+        st.session_state.retraining = False
+    
     # Check if speaker is already trained
-    if st.session_state.voice_cloner.load_speaker_embedding():
+    if st.session_state.speaker_embedding is None and not st.session_state.retraining:
+        st.session_state.speaker_embedding = st.session_state.voice_cloner.read_speaker_embedding(speaker_id)
+    if st.session_state.speaker_embedding is not None:
         st.session_state.speaker_trained = True
         st.markdown('<div class="success-box">✅ Voice model is already trained and ready to use!</div>', unsafe_allow_html=True)
         
         if st.button("🔄 Retrain Voice Model"):
             st.session_state.speaker_trained = False
-            st.session_state.voice_cloner.speaker_embedding = None
+            st.session_state.speaker_embedding = None
+            st.session_state.retraining = True
             st.rerun()
+        
+        # New samples are merged into the saved voice; earlier samples are not needed again
+        with st.expander("➕ Improve voice with more samples"):
+            extra_files = st.file_uploader(
+                "Upload additional voice samples",
+                type=['wav', 'mp3', 'm4a'],
+                accept_multiple_files=True,
+                key="extra_voice_samples"
+            )
+            if extra_files and st.button("Add Samples"):
+                valid_files = []
+                for uploaded_file in extra_files:
+                    temp_path = f"temp_{uploaded_file.name}"
+                    with open(temp_path, "wb") as f:
+                        f.write(uploaded_file.getbuffer())
+                    is_valid, message = validate_audio_file(temp_path)
+                    if is_valid:
+                        valid_files.append(temp_path)
+                    else:
+                        st.write(f"⚠️ {uploaded_file.name}: {message}")
+                        os.remove(temp_path)
+                
+                if valid_files:
+                    with st.spinner("Updating voice model..."):
+                        speaker_embedding = st.session_state.voice_cloner.add_samples(speaker_id, valid_files)
+                    for temp_file in valid_files:
+                        if os.path.exists(temp_file):
+                            os.remove(temp_file)
+                    if speaker_embedding is not None:
+                        st.session_state.speaker_embedding = speaker_embedding
+                        st.success(f"🎉 Voice model updated ({speaker_embedding['num_samples']} samples)")
+                    else:
+                        st.error("❌ Failed to add samples")
         return True
     
     st.markdown("""
@@ -138,12 +202,19 @@ def voice_cloning_section():
     </div>
     """, unsafe_allow_html=True)
     
+    # Long recordings are read block by block, keeping only speech, in bounded memory
+    streaming = st.checkbox(
+        "🎙️ Enroll from a long recording (podcast, interview)",
+        help="Accepts recordings of any length; pauses and silence are skipped"
+    )
+    min_files = 1 if streaming else 2
+    
     # File uploader
     uploaded_files = st.file_uploader(
         "Upload voice samples",
-        type=['wav', 'mp3', 'm4a'],
+        type=['wav', 'mp3', 'flac', 'ogg'] if streaming else ['wav', 'mp3', 'm4a'],
         accept_multiple_files=True,
-        help="Upload 3-5 clear voice samples, each 5-10 seconds long"
+        help="Upload 3-5 clear voice samples, each 5-10 seconds long, or a long recording"
     )
     
     if uploaded_files:
@@ -165,7 +236,7 @@ def voice_cloning_section():
                     f.write(uploaded_file.getbuffer())
                 
                 # Validate file
-                is_valid, message = validate_audio_file(temp_path)
+                is_valid, message = validate_audio_file(temp_path, None) if streaming else validate_audio_file(temp_path)
                 if is_valid:
                     st.success("✅")
                     valid_files.append(temp_path)
@@ -174,12 +245,16 @@ def voice_cloning_section():
                     st.write(f"⚠️ {message}")
         
         # Train voice model button
-        if len(valid_files) >= 2:
+        if len(valid_files) >= min_files:
             if st.button("🎯 Train Voice Model", type="primary"):
                 with st.spinner("Training voice model... This may take a few minutes."):
-                    success = st.session_state.voice_cloner.extract_speaker_embedding(valid_files)
-                    if success:
+                    speaker_embedding = st.session_state.voice_cloner.compute_speaker_embedding(
+                        valid_files, st.session_state.speaker_id, streaming=streaming
+                    )
+                    if speaker_embedding is not None:
+                        st.session_state.speaker_embedding = speaker_embedding
                         st.session_state.speaker_trained = True
+                        st.session_state.retraining = False
                         st.success("🎉 Voice model trained successfully!")
                         st.rerun()
                     else:
@@ -190,7 +265,7 @@ def voice_cloning_section():
                     if os.path.exists(temp_file):
                         os.remove(temp_file)
         else:
-            st.warning("⚠️ Please upload at least 2 valid audio files to train the voice model")
+            st.warning(f"⚠️ Please upload at least {min_files} valid audio file{'s' if min_files > 1 else ''} to train the voice model")
     
     return st.session_state.speaker_trained
 
@@ -238,7 +313,8 @@ def translation_section():
         with st.spinner("Processing... Translating text and generating speech..."):
             # Step 1: Translate text
             translated_text = st.session_state.translator.translate_text(
-                input_text, target_language, source_language
+                input_text, target_language, source_language,
+                deadline=UI_CONFIG['translation_deadline_seconds']
             )
             
             if translated_text:
@@ -250,7 +326,8 @@ def translation_section():
                 # Step 2: Generate speech
                 output_path = st.session_state.voice_cloner.generate_speech(
                     translated_text, 
-                    st.session_state.translator.language_codes.get(target_language, 'en')
+                    st.session_state.translator.language_codes.get(target_language, 'en'),
+                    speaker_embedding=st.session_state.speaker_embedding
                 )
                 
                 if output_path and os.path.exists(output_path):
@@ -6,6 +6,12 @@ import numpy as np
 from typing import List, Tuple
 import tempfile
 from pathlib import Path
+from config import SPEAKER_STORE_CONFIG, VOICE_EMBEDDING_CONFIG, PATHS
+from speaker_store import SpeakerStore
+from speaker_features import (
+    Statistics, combine_statistics, embedding_from_statistics, empty_statistics,
+    parallel_sample_statistics, preprocess_audio, sample_cache_key, statistics_from_embedding
+)
 
 class VoiceCloner:
     def __init__(self):
@@ -14,81 +20,195 @@ class VoiceCloner:
         self.speaker_embedding = None
         self.checkpoints_dir = Path("models/checkpoints")
         self.checkpoints_dir.mkdir(exist_ok=True)
+        self.speaker_store = SpeakerStore()
+        self.speaker_store.migrate_legacy(str(self.checkpoints_dir))
+        # Per-sample statistics keyed by content hash + preprocessing parameters
+        self.embedding_cache = SpeakerStore(
+            PATHS['embedding_cache_dir'], 2 * VOICE_EMBEDDING_CONFIG['n_mels']
+        )
         
-    def preprocess_audio(self, audio_path: str, target_sr: int = 24000) -> np.ndarray:
-        """Preprocess audio file for voice cloning"""
+    def preprocess_audio(self, audio_path: str, target_sr: int = None) -> np.ndarray:
+        """Preprocess audio file for voice cloning (resample, normalize, trim silence)
+        
+        Audio comes back at ``VOICE_EMBEDDING_CONFIG['sample_rate']`` unless
+        another ``target_sr`` is requested.
+        """
         try:
-            # Load audio
-            audio, sr = librosa.load(audio_path, sr=None)
-            
-            # Resample if necessary
-            if sr != target_sr:
-                audio = librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
-            
-            # Normalize audio
-            audio = audio / np.max(np.abs(audio))
-            
-            # Remove silence
-            audio, _ = librosa.effects.trim(audio, top_db=20)
-            
+            audio = preprocess_audio(audio_path)
+            sample_rate = VOICE_EMBEDDING_CONFIG['sample_rate']
+            if target_sr is not None and target_sr != sample_rate:
+                audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=target_sr)
             return audio
         except Exception as e:
             raise Exception(f"Error preprocessing audio {audio_path}: {str(e)}")
     
-    def extract_speaker_embedding(self, audio_samples: List[str]) -> bool:
-        """Extract speaker embedding from multiple audio samples"""
+    def _existing_paths(self, sample_paths: List[str]) -> List[str]:
+        existing = []
+        for sample_path in sample_paths:
+            if os.path.exists(sample_path):
+                existing.append(sample_path)
+            else:
+                print(f"Warning: Audio sample {sample_path} not found")
+        return existing
+    
+    def _samples_statistics(self, sample_paths: List[str], streaming: bool = False) -> Statistics:
+        """Merged log-mel statistics of several samples
+        
+        Samples whose exact audio was seen before come from the cache; the rest
+        are decoded in parallel worker processes. Results are merged in input
+        order, so the outcome does not depend on which worker finishes first.
+        With ``streaming`` each recording is read block by block and only its
+        speech frames are kept, so memory does not grow with its length.
+        """
+        keys = [sample_cache_key(path, streaming) for path in sample_paths]
+        results = {}
+        misses = {}  # key -> path, so duplicate uploads are decoded once
+        for key, path in zip(keys, sample_paths):
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                results[key] = statistics_from_embedding(cached, self.embedding_cache.metadata(key)['frames'])
+            else:
+                misses.setdefault(key, path)
+        
+        if misses:
+            computed = parallel_sample_statistics(list(misses.values()), streaming=streaming)
+            for key, stats in zip(misses, computed):
+                self.embedding_cache.put(
+                    key, embedding_from_statistics(stats), 1, VOICE_EMBEDDING_CONFIG['sample_rate'], frames=stats[0]
+                )
+                results[key] = stats
+        
+        stats = empty_statistics()
+        for key in keys:
+            stats = combine_statistics(stats, results[key])
+        return stats
+    
+    def _store_statistics(self, speaker_id: str, stats: Statistics, num_samples: int) -> dict:
+        """Save a speaker's embedding with the frame count needed to merge more samples into it later"""
+        speaker_id = speaker_id or SPEAKER_STORE_CONFIG['default_speaker_id']
+        speaker_embedding = {
+            'speaker_id': speaker_id,
+            'embedding': embedding_from_statistics(stats),
+            'sample_rate': VOICE_EMBEDDING_CONFIG['sample_rate'],
+            'num_samples': num_samples
+        }
+        self.speaker_store.put(
+            speaker_id,
+            speaker_embedding['embedding'],
+            speaker_embedding['num_samples'],
+            speaker_embedding['sample_rate'],
+            frames=stats[0]
+        )
+        return speaker_embedding
+    
+    def compute_speaker_embedding(self, audio_samples: List[str], speaker_id: str = None,
+                                  streaming: bool = False) -> dict:
+        """Compute and store a speaker's embedding without changing this instance's state
+        
+        The embedding summarizes the log-mel frames of every sample (per-band
+        mean and standard deviation). Samples whose exact audio was enrolled
+        before are not decoded again; the rest are decoded in parallel.
+        ``streaming`` enrolls from long recordings (e.g. podcasts) in bounded
+        memory.
+        """
         try:
-            # For now, we'll create a mock speaker embedding
-            # In a real implementation, you would use OpenVoice here
-            processed_audios = []
-            
-            for sample_path in audio_samples:
-                if os.path.exists(sample_path):
-                    audio = self.preprocess_audio(sample_path)
-                    processed_audios.append(audio)
-                else:
-                    print(f"Warning: Audio sample {sample_path} not found")
-            
-            if not processed_audios:
+            sample_paths = self._existing_paths(audio_samples)
+            num_samples = len(sample_paths)
+            stats = self._samples_statistics(sample_paths, streaming) if sample_paths else empty_statistics()
+            
+            if num_samples == 0 or stats[0] == 0:
                 raise Exception("No valid audio samples found")
             
-            # Create a mock speaker embedding (in real implementation, use OpenVoice)
-            self.speaker_embedding = {
-                'embedding': np.random.rand(256),  # Mock embedding
-                'sample_rate': 24000,
-                'num_samples': len(processed_audios)
-            }
+            speaker_embedding = self._store_statistics(speaker_id, stats, num_samples)
+            print(f"Speaker embedding extracted from {num_samples} samples")
+            return speaker_embedding
             
-            # Save speaker embedding
-            embedding_path = self.checkpoints_dir / "speaker_embedding.npy"
-            np.save(embedding_path, self.speaker_embedding)
+        except Exception as e:
+            print(f"Error extracting speaker embedding: {str(e)}")
+            return None
+    
+    def add_samples(self, speaker_id: str, new_paths: List[str], streaming: bool = False) -> dict:
+        """Fold new samples into an existing speaker's embedding without the earlier audio
+        
+        The stored embedding and frame count are exactly the running statistics
+        (frame-weighted mean and second moments), so only the new samples are
+        decoded and the update does not grow with the speaker's history. A
+        speaker that does not exist yet is enrolled from the new samples.
+        """
+        try:
+            speaker_id = speaker_id or SPEAKER_STORE_CONFIG['default_speaker_id']
+            record = self.speaker_store.metadata(speaker_id)
+            if record is None:
+                return self.compute_speaker_embedding(new_paths, speaker_id, streaming)
+            if 'frames' not in record:
+                raise Exception(f"Speaker '{speaker_id}' has no running statistics; re-enroll from all samples")
+            
+            sample_paths = self._existing_paths(new_paths)
+            new_stats = self._samples_statistics(sample_paths, streaming) if sample_paths else empty_statistics()
+            if new_stats[0] == 0:
+                raise Exception("No valid audio samples found")
             
-            print(f"Speaker embedding extracted from {len(processed_audios)} samples")
-            return True
+            stats = combine_statistics(
+                statistics_from_embedding(self.speaker_store.get(speaker_id), record['frames']), new_stats
+            )
+            speaker_embedding = self._store_statistics(speaker_id, stats, record['num_samples'] + len(sample_paths))
+            
+            print(f"Added {len(sample_paths)} samples to speaker '{speaker_id}' "
+                  f"({speaker_embedding['num_samples']} samples in total)")
+            return speaker_embedding
             
         except Exception as e:
-            print(f"Error extracting speaker embedding: {str(e)}")
+            print(f"Error adding samples to speaker embedding: {str(e)}")
+            return None
+    
+    def extract_speaker_embedding(self, audio_samples: List[str], speaker_id: str = None) -> bool:
+        """Extract speaker embedding from multiple audio samples"""
+        speaker_embedding = self.compute_speaker_embedding(audio_samples, speaker_id)
+        if speaker_embedding is None:
             return False
+        self.speaker_embedding = speaker_embedding
+        return True
     
-    def load_speaker_embedding(self) -> bool:
-        """Load previously saved speaker embedding"""
+    def read_speaker_embedding(self, speaker_id: str = None) -> dict:
+        """Read a saved speaker embedding without changing this instance's state"""
         try:
-            embedding_path = self.checkpoints_dir / "speaker_embedding.npy"
-            if embedding_path.exists():
-                self.speaker_embedding = np.load(embedding_path, allow_pickle=True).item()
-                print("Speaker embedding loaded successfully")
-                return True
+            speaker_id = speaker_id or SPEAKER_STORE_CONFIG['default_speaker_id']
+            embedding = self.speaker_store.get(speaker_id)
+            if embedding is not None:
+                record = self.speaker_store.metadata(speaker_id)
+                print(f"Speaker embedding for '{speaker_id}' loaded successfully")
+                return {
+                    'speaker_id': speaker_id,
+                    'embedding': embedding,  # Zero-copy view into the store
+                    'sample_rate': record['sample_rate'],
+                    'num_samples': record['num_samples']
+                }
             else:
-                print("No saved speaker embedding found")
-                return False
+                print(f"No saved speaker embedding found for '{speaker_id}'")
+                return None
         except Exception as e:
             print(f"Error loading speaker embedding: {str(e)}")
+            return None
+    
+    def load_speaker_embedding(self, speaker_id: str = None) -> bool:
+        """Load previously saved speaker embedding"""
+        speaker_embedding = self.read_speaker_embedding(speaker_id)
+        if speaker_embedding is None:
             return False
+        self.speaker_embedding = speaker_embedding
+        return True
     
-    def generate_speech(self, text: str, language: str = "en", output_path: str = None) -> str:
-        """Generate speech using cloned voice"""
+    def generate_speech(self, text: str, language: str = "en", output_path: str = None,
+                        speaker_embedding: dict = None) -> str:
+        """Generate speech using cloned voice
+        
+        ``speaker_embedding`` lets a shared VoiceCloner speak with a caller's own
+        voice; it defaults to the embedding held by this instance.
+        """
         try:
-            if self.speaker_embedding is None:
+            if speaker_embedding is None:
+                speaker_embedding = self.speaker_embedding
+            if speaker_embedding is None:
                 raise Exception("No speaker embedding available. Please clone voice first.")
             
             # Mock TTS generation (in real implementation, use OpenVoice TTS)
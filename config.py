@@ -8,7 +8,37 @@ MODEL_CONFIG = {
     'max_audio_duration': 30.0,
     'min_audio_duration': 1.0,
     'batch_size': 1,
-    'max_sequence_length': 512
+    'max_sequence_length': 512,
+    'max_batch_tokens': 4096,  # Padded tokens per generate call
+    'max_segment_chars': 1000,  # Sentences longer than this are split before translation
+    'cpu_quantization': None,  # 'int8' applies dynamic int8 quantization when running on CPU
+    'quantization_min_chrf': 0.85,  # Mean chrF vs fp32 required by quantization.py's quality check
+    'backend': 'torch',  # 'torch' or 'onnx' (ONNX Runtime, CPU; needs onnxruntime and optimum)
+    'onnx_intra_op_threads': None,  # None lets ONNX Runtime decide
+    'use_snapshots': True,  # Load from / write pre-converted snapshots under PATHS['snapshots_dir']
+    # Output token budget = ratio * source tokens + slack, capped at max_sequence_length.
+    # Keys are 'src-tgt' language codes; '*' matches any language on that side.
+    'length_ratios': {
+        'default': 2.0,
+        '*-hi': 3.0, '*-bn': 3.0, '*-ta': 3.0, '*-te': 3.0, '*-mr': 3.0, '*-gu': 3.0, '*-ur': 3.0
+    },
+    'length_slack_tokens': 10,
+    'repetition_max_ngram': 4,  # Stop a hypothesis once an n-gram up to this size repeats back to back...
+    'repetition_min_repeats': 4,  # ...this many times
+    # Named decoding profiles, ordered fastest first; each overrides the translator's generation params
+    'decoding_profiles': {
+        'fast': {'num_beams': 1, 'early_stopping': False},
+        'balanced': {'num_beams': 2},
+        'quality': {'num_beams': 5}
+    },
+    'default_decoding_profile': 'quality',
+    'latency_ewma_alpha': 0.2,  # Weight of the newest sample in the per-profile latency history
+    'latency_reprobe_seconds': 300,  # Latency samples older than this are ignored, so slow profiles get retried
+    'vocab_shortlists': False,  # Restrict decoding to per-target shortlists built by vocab_shortlist.py
+    'shortlist_coverage': 0.9995,  # Fraction of observed target tokens a shortlist must cover
+    'shortlist_max_tokens': 24000,
+    'shortlist_max_fraction': 0.5,  # Use the full vocabulary when a batch's shortlist union is larger
+    'shortlist_cached_slices': 4  # lm_head weight slices kept per model, one per set of target shortlists
 }
 
 # GPU Configuration
@@ -26,7 +56,8 @@ AUDIO_CONFIG = {
     'channels': 1,
     'format': 'wav',
     'normalization_db': -20.0,
-    'silence_threshold_db': 20
+    'silence_threshold_db': 20,
+    'max_sample_seconds': 30.0  # Longest voice sample accepted outside streaming enrollment
 }
 
 # UI Configuration
@@ -35,7 +66,8 @@ UI_CONFIG = {
     'supported_formats': ['wav', 'mp3', 'm4a', 'flac'],
     'max_text_length': 1000,
     'default_source_language': 'English',
-    'default_target_language': 'Spanish'
+    'default_target_language': 'Spanish',
+    'translation_deadline_seconds': 3.0  # Latency budget used to pick a decoding profile; None always uses the default
 }
 
 # Paths Configuration
@@ -45,7 +77,91 @@ PATHS = {
     'outputs_dir': 'outputs',
     'processed_dir': 'samples/processed',
     'checkpoints_dir': 'models/checkpoints',
-    'translation_cache': 'models/translation'
+    'translation_cache': 'models/translation',
+    'onnx_dir': 'models/onnx',
+    'snapshots_dir': 'models/snapshots',
+    'shortlists_dir': 'models/shortlists',
+    'speakers_dir': 'models/speakers',
+    'embedding_cache_dir': 'models/speakers/sample_cache'
+}
+
+# Translation Cache Configuration
+CACHE_CONFIG = {
+    'enabled': True,
+    'db_filename': 'translation_cache.sqlite3',  # Stored under PATHS['translation_cache']
+    'max_memory_entries': 10000,
+    'max_disk_entries': 1000000,
+    'ttl_seconds': 30 * 24 * 3600,  # 30 days; None disables expiry
+    'prune_interval': 1000  # Writes between on-disk eviction passes
+}
+
+# Micro-batching Scheduler Configuration
+SCHEDULER_CONFIG = {
+    'max_wait_ms': 5.0,  # Longest time the oldest queued request waits for batch-mates
+    'max_batch_tokens': None,  # None uses MODEL_CONFIG['max_batch_tokens']
+    'max_batch_size': 64
+}
+
+# Continuous Batching Configuration
+CONTINUOUS_BATCHING_CONFIG = {
+    'max_active_sequences': 64,  # Sentences decoding at once across all cohorts
+    'max_cohorts': 4  # Forward passes per decode step; new work waits when reached
+}
+
+# Multi-process Replica Pool Configuration
+REPLICA_POOL_CONFIG = {
+    'num_workers': None,  # None uses available cores // threads_per_worker
+    'threads_per_worker': 4,  # Intra-op threads per replica
+    'pin_cores': True,  # Pin each replica to its own core set (Linux)
+    'start_method': None,  # None prefers 'fork' (copy-on-write) and falls back to 'spawn'
+    'max_respawns': 3,  # Replacements per replica after it dies; after that it stops receiving requests
+    'monitor_interval_seconds': 1.0  # How often replica liveness is checked
+}
+
+# Speculative Decoding Configuration (greedy decoding profiles only)
+SPECULATIVE_CONFIG = {
+    # 'src-tgt' -> draft model sharing M2M100's vocabulary, e.g. {'en-es': 'models/drafts/m2m100-en-es-small'}
+    'draft_models': {},
+    'num_assistant_tokens': 5  # Tokens the draft proposes per verification pass
+}
+
+# Translation Router Configuration
+ROUTER_CONFIG = {
+    # 'src-tgt' -> compact bilingual (Marian/opus-mt) model; unlisted pairs use MODEL_CONFIG['translation_model']
+    'routes': {
+        'en-es': 'Helsinki-NLP/opus-mt-en-es',
+        'es-en': 'Helsinki-NLP/opus-mt-es-en',
+        'en-fr': 'Helsinki-NLP/opus-mt-en-fr',
+        'fr-en': 'Helsinki-NLP/opus-mt-fr-en',
+        'en-de': 'Helsinki-NLP/opus-mt-en-de',
+        'de-en': 'Helsinki-NLP/opus-mt-de-en'
+    }
+}
+
+# Model Pool Configuration (resident translation backends)
+MODEL_POOL_CONFIG = {
+    'max_resident_bytes': 3 * 1024 ** 3,  # Least recently used models are unloaded beyond this
+    'idle_timeout_seconds': 30 * 60,  # Unload models unused this long; None keeps them resident
+    'reaper_interval_seconds': 60,
+    'retry_failed_load_seconds': 300  # Back-off before retrying a model that failed to load
+}
+
+# Speaker Store Configuration
+SPEAKER_STORE_CONFIG = {
+    'embedding_dim': 256,
+    'default_speaker_id': 'default'  # Used when no speaker ID is given, and for the migrated legacy embedding
+}
+
+# Voice Embedding Configuration (changing any value invalidates cached sample statistics)
+VOICE_EMBEDDING_CONFIG = {
+    'sample_rate': 24000,
+    'top_db': 20,  # Silence trimming threshold
+    'n_mels': 128,  # Embedding = per-band mean + std, so 2 * n_mels == SPEAKER_STORE_CONFIG['embedding_dim']
+    'n_fft': 1024,
+    'hop_length': 256,
+    'feature_version': 1,
+    'preprocess_workers': None,  # Size of the process pool shared by all enrollments; None = one per CPU core
+    'stream_block_seconds': 30.0  # Streaming enrollment decodes long recordings one block at a time
 }
 
 # Language Configuration
@@ -0,0 +1,306 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List
+
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+
+from config import MODEL_CONFIG, CONTINUOUS_BATCHING_CONFIG
+from text_segmentation import join_sentences
+from translate_text import BlockingTranslateMixin, TextTranslator, _repeating_rows
+
+
+def _select_rows(past_key_values, index: torch.Tensor):
+    """Keep only the given batch rows of a decoder KV cache"""
+    if hasattr(past_key_values, 'reorder_cache'):
+        # Cache objects (newer transformers) index-select every layer in place
+        past_key_values.reorder_cache(index)
+        return past_key_values
+    return tuple(tuple(tensor.index_select(0, index) for tensor in layer) for layer in past_key_values)
+
+
+class _Request:
+    def __init__(self, text: str, tgt_lang: str, separators: List[str]):
+        self.text = text
+        self.tgt_lang = tgt_lang
+        self.separators = separators
+        self.results = [None] * len(separators)
+        self.remaining = len(separators)
+        self.future = Future()
+
+
+class _Sequence:
+    __slots__ = ('request', 'position', 'text', 'cache_key', 'input_ids', 'tgt_lang', 'tokens', 'max_new_tokens')
+
+    def __init__(self, request: _Request, position: int, text: str, cache_key: str, input_ids: List[int],
+                 tgt_lang: str, max_new_tokens: int):
+        self.request = request
+        self.position = position
+        self.text = text
+        self.cache_key = cache_key
+        self.input_ids = input_ids
+        self.tgt_lang = tgt_lang
+        self.tokens = []
+        self.max_new_tokens = max_new_tokens
+
+
+class _Cohort:
+    """Sequences admitted at the same step; they share decoder length and therefore one KV cache"""
+
+    def __init__(self, sequences: List[_Sequence], encoder_hidden: torch.Tensor, encoder_mask: torch.Tensor,
+                 decoder_input_ids: torch.Tensor):
+        self.sequences = sequences
+        self.encoder_hidden = encoder_hidden
+        self.encoder_mask = encoder_mask
+        self.decoder_input_ids = decoder_input_ids
+        self.past_key_values = None
+
+
+class ContinuousBatchingEngine(BlockingTranslateMixin):
+    """Iteration-level (continuous) batching decoder around the M2M100 model
+
+    New sentences join the decode loop at step boundaries and finished ones
+    leave immediately instead of waiting for the whole batch to drain.
+    M2M100 derives decoder positions from a single past length, so sequences
+    that joined at the same step form a cohort with its own KV cache; each
+    step runs one forward pass per cohort. Decoding is greedy.
+    """
+
+    def __init__(self, translator: TextTranslator = None, max_active_sequences: int = None,
+                 max_cohorts: int = None, max_new_tokens: int = None):
+        self.translator = translator or TextTranslator()
+        self.max_active_sequences = max_active_sequences or CONTINUOUS_BATCHING_CONFIG['max_active_sequences']
+        self.max_cohorts = max_cohorts or CONTINUOUS_BATCHING_CONFIG['max_cohorts']
+        self.max_new_tokens = max_new_tokens or MODEL_CONFIG['max_sequence_length']
+        # Cache entries record how this engine actually decodes, so they never
+        # stand in for beam-search results of TextTranslator.generate
+        self.generation_params = {
+            'decoder': 'continuous_batching',
+            'num_beams': 1,
+            'do_sample': False,
+            'max_new_tokens': self.max_new_tokens
+        }
+
+        self._queue = queue.Queue()
+        self._cohorts = []
+        self._worker = None
+        self._start_lock = threading.Lock()  # Concurrent first submits must start exactly one decode loop
+        self._stopping = threading.Event()
+        self._results_lock = threading.Lock()  # Cache hits complete on the caller's thread
+        self._metrics_lock = threading.Lock()
+        self._steps = 0
+        self._forward_passes = 0
+        self._tokens_generated = 0
+        self._completed_requests = 0
+
+    def _running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive() and not self._stopping.is_set()
+
+    def start(self):
+        """Start the decode loop, loading the model first if needed"""
+        with self._start_lock:
+            if self._running():
+                return
+            if self._worker is not None:
+                # A loop from a stop() that timed out still owns the cohorts; let it drain first
+                self._worker.join()
+            if not self.translator.load_model():
+                raise RuntimeError("Translation model is not available")
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="continuous-batching", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = None):
+        """Finish in-flight and queued sequences, then stop the decode loop"""
+        with self._start_lock:
+            if self._worker is None:
+                return
+            self._stopping.set()
+            self._worker.join(timeout)
+            if not self._worker.is_alive():
+                self._worker = None
+
+    def submit(self, text: str, target_language: str, source_language: str = "English") -> Future:
+        """Queue a translation and return a future resolving to the translated text"""
+        if not self._running():
+            self.start()
+        translator = self.translator
+        src_lang = translator.language_codes.get(source_language, 'en')
+        tgt_lang = translator.language_codes.get(target_language, 'en')
+
+        # Splitting loads the model if it was unloaded since start(); cache keys name the loaded backend
+        pieces = translator._split(text, src_lang) if src_lang != tgt_lang else []
+        request = _Request(text, tgt_lang, [separator for _, separator in pieces])
+        if not pieces:
+            request.future.set_result(text)
+            return request.future
+
+        keys = translator._cache_keys(
+            [(sentence, src_lang, tgt_lang) for sentence, _ in pieces], generation_params=self.generation_params
+        )
+        cached = translator.cache.get_many(keys) if translator.cache is not None else {}
+        for position, ((sentence, _), key) in enumerate(zip(pieces, keys)):
+            if key in cached:
+                self._complete(request, position, cached[key])
+            else:
+                input_ids = translator._encode(sentence, src_lang)
+                # Bound each sentence by its language pair's expected output length
+                budget = translator._length_budget(
+                    len(input_ids) - translator.source_framing_tokens, src_lang, tgt_lang
+                )
+                self._queue.put(_Sequence(
+                    request, position, sentence, key, input_ids, tgt_lang, min(budget, self.max_new_tokens)
+                ))
+        return request.future
+
+    def _complete(self, request: _Request, position: int, translation: str):
+        with self._results_lock:
+            if request.future.done():
+                return  # Another sentence of this request already failed
+            request.results[position] = translation
+            request.remaining -= 1
+            if request.remaining > 0:
+                return
+        request.future.set_result(join_sentences(request.results, request.separators, request.tgt_lang))
+        with self._metrics_lock:
+            self._completed_requests += 1
+
+    def _active_count(self) -> int:
+        return sum(len(cohort.sequences) for cohort in self._cohorts)
+
+    def _admit(self):
+        """Pull waiting sequences into a new cohort at a step boundary"""
+        capacity = self.max_active_sequences - self._active_count()
+        if capacity <= 0 or len(self._cohorts) >= self.max_cohorts:
+            return
+        sequences = []
+        idle = not self._cohorts
+        while len(sequences) < capacity:
+            try:
+                # Block briefly only when there is nothing else to do
+                sequence = self._queue.get(timeout=0.05) if idle and not sequences else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            sequences.append(sequence)
+        if sequences:
+            try:
+                self._cohorts.append(self._start_cohort(sequences))
+            except Exception as e:
+                self._fail(sequences, e)
+
+    def _start_cohort(self, sequences: List[_Sequence]) -> _Cohort:
+        """Encode new sequences once and prime their decoders with the target-language token"""
+        translator = self.translator
+        inputs = translator.tokenizer.pad(
+            {'input_ids': [sequence.input_ids for sequence in sequences]},
+            return_tensors="pt"
+        )
+        with translator.borrow_model() as (model, device), torch.no_grad():
+            input_ids = inputs['input_ids'].to(device)
+            attention_mask = inputs['attention_mask'].to(device)
+            hidden = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+            decoder_start = model.config.decoder_start_token_id
+            decoder_input_ids = torch.tensor(
+                [[decoder_start, translator.tokenizer.get_lang_id(sequence.tgt_lang)] for sequence in sequences],
+                device=device
+            )
+        return _Cohort(sequences, hidden, attention_mask, decoder_input_ids)
+
+    def _step(self, cohort: _Cohort) -> bool:
+        """Advance a cohort by one token; return False once every sequence has finished"""
+        translator = self.translator
+        with translator.borrow_model() as (model, _), torch.no_grad():
+            outputs = model(
+                encoder_outputs=BaseModelOutput(last_hidden_state=cohort.encoder_hidden),
+                attention_mask=cohort.encoder_mask,
+                decoder_input_ids=cohort.decoder_input_ids,
+                past_key_values=cohort.past_key_values,
+                use_cache=True,
+                return_dict=True
+            )
+        next_tokens = outputs.logits[:, -1, :].argmax(dim=-1)
+        cohort.past_key_values = outputs.past_key_values
+        cohort.decoder_input_ids = next_tokens.unsqueeze(-1)
+
+        eos_token_id = translator.tokenizer.eos_token_id
+        max_ngram = MODEL_CONFIG['repetition_max_ngram']
+        min_repeats = MODEL_CONFIG['repetition_min_repeats']
+        keep = []
+        for row, (sequence, token) in enumerate(zip(cohort.sequences, next_tokens.tolist())):
+            finished = token == eos_token_id
+            if not finished:
+                sequence.tokens.append(token)
+                finished = len(sequence.tokens) >= sequence.max_new_tokens
+            if not finished and max_ngram and min_repeats > 1 and len(sequence.tokens) >= min_repeats:
+                # Stop sequences that have degenerated into an n-gram loop
+                finished = bool(_repeating_rows(
+                    torch.tensor([sequence.tokens[-max_ngram * min_repeats:]]), max_ngram, min_repeats
+                )[0])
+            if finished:
+                self._finish(sequence)
+            else:
+                keep.append(row)
+
+        with self._metrics_lock:
+            self._forward_passes += 1
+            self._tokens_generated += len(cohort.sequences)
+
+        if not keep:
+            return False
+        if len(keep) < len(cohort.sequences):
+            # Finished sequences leave the batch immediately
+            index = torch.tensor(keep, device=cohort.encoder_hidden.device)
+            cohort.sequences = [cohort.sequences[row] for row in keep]
+            cohort.encoder_hidden = cohort.encoder_hidden.index_select(0, index)
+            cohort.encoder_mask = cohort.encoder_mask.index_select(0, index)
+            cohort.decoder_input_ids = cohort.decoder_input_ids.index_select(0, index)
+            cohort.past_key_values = _select_rows(cohort.past_key_values, index)
+        return True
+
+    def _finish(self, sequence: _Sequence):
+        translator = self.translator
+        translated = translator.tokenizer.decode(sequence.tokens, skip_special_tokens=True)
+        if translated and translator.cache is not None:
+            translator.cache.put(sequence.cache_key, translated)
+        self._complete(sequence.request, sequence.position, translated or sequence.text)
+
+    def _fail(self, sequences: List[_Sequence], error: Exception):
+        print(f"Error in continuous batching: {str(error)}")
+        with self._results_lock:
+            for sequence in sequences:
+                if not sequence.request.future.done():
+                    sequence.request.future.set_exception(error)
+
+    def _run(self):
+        while True:
+            self._admit()
+            if not self._cohorts:
+                if self._stopping.is_set() and self._queue.empty():
+                    break
+                continue
+
+            still_running = []
+            for cohort in self._cohorts:
+                try:
+                    if self._step(cohort):
+                        still_running.append(cohort)
+                except Exception as e:
+                    self._fail(cohort.sequences, e)
+            self._cohorts = still_running
+            with self._metrics_lock:
+                self._steps += 1
+
+    def metrics(self) -> Dict[str, float]:
+        """Return decode-loop statistics"""
+        with self._metrics_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'active_sequences': self._active_count(),
+                'cohorts': len(self._cohorts),
+                'steps': self._steps,
+                'forward_passes': self._forward_passes,
+                'tokens_generated': self._tokens_generated,
+                'avg_rows_per_forward': self._tokens_generated / self._forward_passes if self._forward_passes else 0.0,
+                'completed_requests': self._completed_requests
+            }
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+import torch
+
+from config import PATHS
+
+_probe_lock = threading.Lock()
+_probe_result = None
+
+
+def _probe_path() -> str:
+    return os.path.join(PATHS['checkpoints_dir'], "device_probe.json")
+
+
+def _driver_version() -> str:
+    """Best-effort CUDA driver version; private torch API, so failures are tolerated"""
+    try:
+        return str(torch._C._cuda_getDriverVersion())
+    except Exception:
+        return "unknown"
+
+
+def probe_key() -> str:
+    """Identify the software/hardware combination a probe result is valid for"""
+    major, minor = torch.cuda.get_device_capability(0)
+    return ";".join([
+        f"torch={torch.__version__}",
+        f"cuda={torch.version.cuda}",
+        f"driver={_driver_version()}",
+        f"gpu={torch.cuda.get_device_name(0)}",
+        f"cc={major}.{minor}"
+    ])
+
+
+def is_incompatibility(reason: str) -> bool:
+    """Whether a CUDA error means this build cannot run on the GPU at all, rather than a transient fault"""
+    return "no kernel image is available" in reason
+
+
+def _read_probes() -> Dict[str, dict]:
+    try:
+        with open(_probe_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_probe(key: str, result: dict):
+    probes = _read_probes()
+    probes[key] = result
+    os.makedirs(os.path.dirname(_probe_path()), exist_ok=True)
+    temp_path = _probe_path() + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(probes, f, indent=2)
+    os.replace(temp_path, _probe_path())
+
+
+def probe_cuda(force: bool = False) -> dict:
+    """Check once whether CUDA kernels run on this GPU; the result is persisted per driver/torch version"""
+    global _probe_result
+    if not torch.cuda.is_available():
+        return {'usable': False, 'reason': "CUDA not available"}
+
+    with _probe_lock:
+        if _probe_result is not None and not force:
+            return _probe_result
+
+        key = probe_key()
+        cached = _read_probes().get(key)
+        if cached is not None and not force:
+            _probe_result = cached
+            return cached
+
+        try:
+            # Exercise the kernel families the translator needs: fp16 matmul and embedding lookup
+            weights = torch.randn(16, 8, device="cuda", dtype=torch.float16)
+            hidden = torch.nn.functional.embedding(torch.tensor([[1, 2, 3]], device="cuda"), weights)
+            _ = (hidden @ weights.T).float().softmax(dim=-1).sum().item()
+            torch.cuda.synchronize()
+            result = {'usable': True, 'reason': ""}
+        except RuntimeError as e:
+            result = {'usable': False, 'reason': str(e)}
+
+        result['probed_at'] = time.time()
+        # Transient failures (out of memory, busy device) are probed again on the next start
+        if result['usable'] or is_incompatibility(result['reason']):
+            try:
+                _write_probe(key, result)
+            except OSError as e:
+                print(f"Could not persist device probe: {e}")
+        _probe_result = result
+        print(f"GPU capability probe: {'usable' if result['usable'] else 'unusable'} ({key})")
+        return result
+
+
+def record_cuda_failure(reason: str):
+    """Stop using the GPU in this process after a runtime failure
+
+    Only incompatibilities (no kernel image for this GPU) are persisted so that
+    later starts go straight to CPU; other CUDA errors, such as device-side
+    asserts, leave the GPU to be probed again on the next start.
+    """
+    global _probe_result
+    if not torch.cuda.is_available():
+        return
+    with _probe_lock:
+        _probe_result = {'usable': False, 'reason': reason, 'probed_at': time.time()}
+        if not is_incompatibility(reason):
+            return
+        try:
+            _write_probe(probe_key(), _probe_result)
+        except OSError as e:
+            print(f"Could not persist device probe: {e}")
+
+
+class DeviceManager:
+    """Chooses the inference device and runs GPU->CPU failover as a background transition
+
+    Callers that arrive while a failover is in progress wait on it instead of
+    using the model mid-migration; the failover itself runs exactly once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self.failed_over = False
+
+    def preferred_device(self) -> torch.device:
+        """CUDA if the (cached) capability probe passed, CPU otherwise"""
+        return torch.device("cuda") if probe_cuda()['usable'] else torch.device("cpu")
+
+    @property
+    def failover_in_progress(self) -> bool:
+        return not self._idle.is_set()
+
+    def begin_failover(self, migrate: Callable[[], None], reason: str):
+        """Start moving to CPU in the background; repeated calls join the same transition"""
+        with self._lock:
+            if self.failed_over or self.failover_in_progress:
+                return
+            self._idle.clear()
+        record_cuda_failure(reason)
+        threading.Thread(target=self._run_failover, args=(migrate,), name="device-failover", daemon=True).start()
+
+    def _run_failover(self, migrate: Callable[[], None]):
+        try:
+            print("Moving translation model to CPU in the background...")
+            migrate()
+            print("GPU->CPU failover complete")
+        except Exception as e:
+            print(f"Error during GPU->CPU failover: {str(e)}")
+        finally:
+            self.failed_over = True
+            self._idle.set()
+
+    def wait_for_failover(self, timeout: float = None) -> bool:
+        """Block until no failover is in progress"""
+        return self._idle.wait(timeout)
@@ -0,0 +1,273 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from config import MODEL_POOL_CONFIG
+
+
+def model_memory_bytes(model) -> int:
+    """Approximate resident size of a model's parameters and buffers"""
+    if model is None or not hasattr(model, 'parameters'):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class _PoolEntry:
+    __slots__ = ('instance', 'bytes', 'last_used', 'in_use', 'loads', 'evictions', 'loading', 'unloading', 'failed_at')
+
+    def __init__(self, instance: Any):
+        self.instance = instance
+        self.bytes = 0
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.loads = 0
+        self.evictions = 0
+        self.loading = None  # Event set when an in-progress load finishes
+        self.unloading = None  # Event set when an eviction selected under the lock has finished unloading
+        self.failed_at = None
+
+
+class ModelPool:
+    """Keeps models resident within a memory budget and unloads idle ones
+
+    Pooled objects follow the translator interface: ``load_model()``,
+    ``unload_model()``, ``is_loaded()`` and a ``model`` attribute used to
+    measure their footprint. Loads run on a background thread, so a model can
+    be warmed ahead of demand with ``prefetch``; ``use`` waits for it and pins
+    it while a request runs. When resident models exceed the budget, or sit
+    unused past the idle timeout, the least recently used unpinned ones are
+    unloaded and reloaded on their next demand.
+    """
+
+    def __init__(self, max_resident_bytes: int = None, idle_timeout: float = None, reaper_interval: float = None,
+                 retry_failed_after: float = None):
+        self.max_resident_bytes = (
+            max_resident_bytes if max_resident_bytes is not None else MODEL_POOL_CONFIG['max_resident_bytes']
+        )
+        self.idle_timeout = idle_timeout if idle_timeout is not None else MODEL_POOL_CONFIG['idle_timeout_seconds']
+        self.reaper_interval = reaper_interval or MODEL_POOL_CONFIG['reaper_interval_seconds']
+        self.retry_failed_after = (
+            retry_failed_after if retry_failed_after is not None else MODEL_POOL_CONFIG['retry_failed_load_seconds']
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._stopping = threading.Event()
+        self._reaper = None
+
+    def register(self, name: str, instance: Any) -> Any:
+        """Add a (not necessarily loaded) model to the pool; returns the pooled instance"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _PoolEntry(instance)
+                if instance.is_loaded():
+                    entry.bytes = model_memory_bytes(getattr(instance, 'model', None))
+            self._ensure_reaper()
+            return entry.instance
+
+    def _ensure_reaper(self):
+        """Start the idle reaper if it is not running (again, after ``close``); callers hold the lock"""
+        if self.idle_timeout and self._reaper is None:
+            self._stopping = threading.Event()
+            self._reaper = threading.Thread(
+                target=self._reap, args=(self._stopping,), name="model-pool-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_resident(self, name: str) -> bool:
+        """Check whether a model is loaded and not currently being (re)loaded"""
+        entry = self._entries.get(name)
+        return entry is not None and self._resident(entry)
+
+    @staticmethod
+    def _resident(entry: _PoolEntry) -> bool:
+        return entry.loading is None and entry.unloading is None and entry.instance.is_loaded()
+
+    def _start_load(self, name: str, entry: _PoolEntry) -> threading.Event:
+        """Start a background load unless one is running; callers hold the pool lock"""
+        if entry.loading is None:
+            entry.loading = threading.Event()
+            threading.Thread(target=self._load, args=(name, entry), name=f"model-pool-load-{name}", daemon=True).start()
+        return entry.loading
+
+    def _load(self, name: str, entry: _PoolEntry):
+        loaded = False
+        try:
+            loaded = entry.instance.load_model()
+        except Exception as e:
+            print(f"Error loading {name}: {str(e)}")
+        with self._lock:
+            if loaded:
+                entry.bytes = model_memory_bytes(getattr(entry.instance, 'model', None))
+                entry.loads += 1
+                entry.failed_at = None
+            else:
+                entry.failed_at = time.monotonic()
+            entry.last_used = time.monotonic()
+            entry.loading.set()
+            entry.loading = None
+        if loaded:
+            self._enforce_budget(keep=name)
+
+    def _recently_failed(self, entry: _PoolEntry) -> bool:
+        return entry.failed_at is not None and time.monotonic() - entry.failed_at < self.retry_failed_after
+
+    def prefetch(self, name: str) -> bool:
+        """Warm a model in the background; True if it is already resident"""
+        with self._lock:
+            entry = self._entries[name]
+            if self._resident(entry):
+                return True
+            if entry.unloading is None and not self._recently_failed(entry):
+                self._start_load(name, entry)
+            return False
+
+    def load(self, name: str, pin: bool = False) -> bool:
+        """Load a model (or wait for its background load); False if loading failed
+
+        With ``pin`` the model is also marked in use in the same lock
+        acquisition that found it resident, so no eviction can slip in between.
+        """
+        while True:
+            with self._lock:
+                self._ensure_reaper()
+                entry = self._entries[name]
+                unloading = entry.unloading
+                if unloading is None:
+                    if self._resident(entry):
+                        if not entry.bytes:
+                            # Reloaded outside the pool (e.g. by a direct call)
+                            entry.bytes = model_memory_bytes(getattr(entry.instance, 'model', None))
+                        entry.last_used = time.monotonic()
+                        if pin:
+                            entry.in_use += 1
+                        return True
+                    if entry.loading is None and self._recently_failed(entry):
+                        return False
+                    done = self._start_load(name, entry)
+            # Wait for an eviction or load in progress, then check residency again. A load
+            # that succeeded may already have been evicted by a racing one; that just loops
+            (unloading or done).wait()
+            if unloading is None and entry.failed_at is not None and not entry.instance.is_loaded():
+                return False
+
+    @contextmanager
+    def use(self, name: str):
+        """Yield a loaded model, keeping it from being evicted until the block exits"""
+        if not self.load(name, pin=True):
+            raise RuntimeError(f"Model {name} is not available")
+        entry = self._entries[name]
+        try:
+            yield entry.instance
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+            # Models kept over budget only because they were pinned can go now
+            self._enforce_budget()
+
+    def _unload(self, victims: List[str], reason: str):
+        """Unload models selected under the lock; unloading itself waits for their in-flight calls"""
+        for name in victims:
+            entry = self._entries[name]
+            print(f"Unloading {name} ({reason})")
+            try:
+                entry.instance.unload_model()
+            finally:
+                with self._lock:
+                    entry.unloading.set()
+                    entry.unloading = None
+
+    def _select(self, names: List[str]) -> List[str]:
+        """Mark models as evicted so nothing pins them before they unload; callers hold the lock"""
+        for name in names:
+            entry = self._entries[name]
+            entry.bytes = 0
+            entry.evictions += 1
+            entry.unloading = threading.Event()
+        return names
+
+    def _enforce_budget(self, keep: str = None):
+        """Unload least recently used, unpinned models until resident memory fits the budget"""
+        if not self.max_resident_bytes:
+            return
+        with self._lock:
+            resident = sorted(
+                (name for name, entry in self._entries.items() if entry.bytes and entry.loading is None),
+                key=lambda name: self._entries[name].last_used
+            )
+            total = sum(self._entries[name].bytes for name in resident)
+            victims = []
+            for name in resident:
+                if total <= self.max_resident_bytes:
+                    break
+                entry = self._entries[name]
+                if name == keep or entry.in_use:
+                    continue
+                total -= entry.bytes
+                victims.append(name)
+            self._select(victims)
+        self._unload(victims, "memory budget")
+
+    def evict(self, name: str) -> bool:
+        """Unload a model now unless a request is using it"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.in_use or not self._resident(entry):
+                return False
+            self._select([name])
+        self._unload([name], "requested")
+        return True
+
+    def evict_idle(self) -> List[str]:
+        """Unload every model unused for longer than the idle timeout"""
+        if not self.idle_timeout:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            victims = self._select([
+                name for name, entry in self._entries.items()
+                if entry.bytes and not entry.in_use and entry.loading is None
+                and now - entry.last_used > self.idle_timeout
+            ])
+        self._unload(victims, "idle")
+        return victims
+
+    def _reap(self, stopping: threading.Event):
+        while not stopping.wait(self.reaper_interval):
+            self.evict_idle()
+
+    def close(self):
+        """Stop the idle reaper; it restarts if the pool is used again"""
+        with self._lock:
+            self._stopping.set()
+            self._reaper = None
+
+    def report(self) -> Dict[str, Any]:
+        """Return each model's residency, footprint and usage, plus pool totals"""
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                name: {
+                    'resident': bool(entry.bytes) and entry.instance.is_loaded(),
+                    'loading': entry.loading is not None,
+                    'memory_mb': entry.bytes / 1024 ** 2,
+                    'idle_seconds': now - entry.last_used,
+                    'in_use': entry.in_use,
+                    'loads': entry.loads,
+                    'evictions': entry.evictions
+                }
+                for name, entry in self._entries.items()
+            }
+            resident = sum(entry.bytes for entry in self._entries.values())
+        return {
+            'models': models,
+            'resident_mb': resident / 1024 ** 2,
+            'max_resident_mb': self.max_resident_bytes / 1024 ** 2 if self.max_resident_bytes else None,
+            'idle_timeout_seconds': self.idle_timeout
+        }
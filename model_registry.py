@@ -0,0 +1,95 @@
+import threading
+import weakref
+from typing import Any, Callable, Dict, List
+
+
+class _Entry:
+    def __init__(self, instance: Any):
+        self.instance = instance
+        self.refcount = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Process-wide registry of shared model objects with reference-counted lifetimes
+
+    The first ``acquire`` of a name creates the object, later ones share it.
+    ``ensure_loaded`` loads its weights exactly once even under concurrent
+    callers, and when the last reference is released the weights are unloaded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+
+    def acquire(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the shared object for a name, creating it on first use"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = _Entry(factory())
+                self._entries[name] = entry
+            entry.refcount += 1
+            return entry.instance
+
+    def ensure_loaded(self, name: str) -> bool:
+        """Load the shared object's model once; concurrent callers wait for the first load"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"No model registered under '{name}'")
+        instance = entry.instance
+        if not hasattr(instance, 'load_model'):
+            return True
+        with entry.load_lock:
+            if hasattr(instance, 'is_loaded') and instance.is_loaded():
+                return True
+            return instance.load_model()
+
+    def release(self, name: str):
+        """Drop one reference; the last release unloads and forgets the object"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            del self._entries[name]
+        if hasattr(entry.instance, 'unload_model'):
+            with entry.load_lock:
+                entry.instance.unload_model()
+
+    def release_many(self, names: List[str]):
+        for name in names:
+            self.release(name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return reference counts and load state for every shared object"""
+        with self._lock:
+            return {
+                name: {
+                    'refcount': entry.refcount,
+                    'loaded': entry.instance.is_loaded() if hasattr(entry.instance, 'is_loaded') else True
+                }
+                for name, entry in self._entries.items()
+            }
+
+
+class ModelLease:
+    """Holds references to shared models for one owner (e.g. a Streamlit session)
+
+    References are released explicitly with ``close`` or automatically when the
+    lease is garbage collected together with its owner.
+    """
+
+    def __init__(self, registry: ModelRegistry, names: List[str]):
+        self.names = list(names)
+        self._finalizer = weakref.finalize(self, registry.release_many, self.names)
+
+    def close(self):
+        self._finalizer()
+
+
+# Shared by every session in this process
+registry = ModelRegistry()
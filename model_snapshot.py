@@ -0,0 +1,119 @@
+"""
+Pre-converted model snapshots for fast translator cold starts.
+A snapshot stores the tokenizer, config and safetensors weights already in
+the final dtype, plus a manifest describing them. Loading memory-maps the
+weights straight onto the target device without an fp32 staging copy.
+"""
+
+import json
+import os
+import time
+from typing import Optional, Tuple
+
+import torch
+import transformers
+from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
+
+from config import MODEL_CONFIG, PATHS
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_DTYPES = {
+    'float32': torch.float32,
+    'float16': torch.float16,
+    'bfloat16': torch.bfloat16
+}
+
+
+def _dtype_name(dtype: torch.dtype) -> str:
+    return str(dtype).replace("torch.", "")
+
+
+def snapshot_dir(model_name: str, dtype: torch.dtype) -> str:
+    """Directory of the snapshot for a model in a given dtype"""
+    return os.path.join(PATHS['snapshots_dir'], f"{model_name.replace('/', '--')}--{_dtype_name(dtype)}")
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    """Return the snapshot manifest, or None if the directory is not a complete snapshot"""
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    if not all(os.path.exists(os.path.join(directory, name)) for name in manifest.get('files', [])):
+        return None
+    return manifest
+
+
+def save_snapshot(model, tokenizer, model_name: str, dtype: torch.dtype, directory: str = None) -> str:
+    """Write a model, its tokenizer and a manifest as a snapshot in the given dtype"""
+    directory = directory or snapshot_dir(model_name, dtype)
+    os.makedirs(directory, exist_ok=True)
+
+    model.to(dtype).save_pretrained(directory, safe_serialization=True)
+    tokenizer.save_pretrained(directory)
+
+    files = sorted(
+        name for name in os.listdir(directory)
+        if name != MANIFEST_NAME and os.path.isfile(os.path.join(directory, name))
+    )
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'model_name': model_name,
+        'dtype': _dtype_name(dtype),
+        'torch_version': torch.__version__,
+        'transformers_version': transformers.__version__,
+        'created_at': time.time(),
+        'files': files
+    }
+    # Write the manifest last so a partial snapshot is never treated as complete
+    temp_path = os.path.join(directory, MANIFEST_NAME + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+    print(f"Model snapshot saved to {directory}")
+    return directory
+
+
+def load_snapshot(directory: str, device: torch.device) -> Tuple[M2M100ForConditionalGeneration, M2M100Tokenizer]:
+    """Memory-map a snapshot directly onto a device in its stored dtype"""
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No complete model snapshot in {directory}")
+
+    tokenizer = M2M100Tokenizer.from_pretrained(directory)
+    model = M2M100ForConditionalGeneration.from_pretrained(
+        directory,
+        torch_dtype=_DTYPES[manifest['dtype']],
+        low_cpu_mem_usage=True,
+        device_map={"": str(device)},
+        use_safetensors=True
+    )
+    model.eval()
+    return model, tokenizer
+
+
+def create_snapshot(model_name: str = None, dtype: torch.dtype = None) -> str:
+    """Download (or reuse the Hugging Face cache for) a model and write its snapshot"""
+    model_name = model_name or MODEL_CONFIG['translation_model']
+    if dtype is None:
+        dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+    tokenizer = M2M100Tokenizer.from_pretrained(model_name, cache_dir=PATHS['translation_cache'])
+    model = M2M100ForConditionalGeneration.from_pretrained(
+        model_name,
+        cache_dir=PATHS['translation_cache'],
+        torch_dtype=dtype,
+        low_cpu_mem_usage=True
+    )
+    return save_snapshot(model, tokenizer, model_name, dtype)
+
+
+if __name__ == "__main__":
+    create_snapshot()
@@ -0,0 +1,74 @@
+"""
+ONNX Runtime backend for TextTranslator.
+Exports M2M100 once to ONNX encoder/decoder graphs (with past key values) and
+loads them through ONNX Runtime with full graph optimizations.
+"""
+
+import os
+
+from config import MODEL_CONFIG, PATHS
+
+
+def onnx_model_dir(model_name: str) -> str:
+    """Directory holding the exported graphs for a model"""
+    return os.path.join(PATHS['onnx_dir'], model_name.replace("/", "--"))
+
+
+def is_onnx_available() -> bool:
+    """Check whether the optional ONNX Runtime dependencies are installed"""
+    try:
+        import onnxruntime  # noqa: F401
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def export_onnx_model(model_name: str = None, output_dir: str = None) -> str:
+    """Export the translation model to ONNX once and save it to disk"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    model_name = model_name or MODEL_CONFIG['translation_model']
+    output_dir = output_dir or onnx_model_dir(model_name)
+
+    print(f"Exporting {model_name} to ONNX (one-time step)...")
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        export=True,
+        use_cache=True,
+        cache_dir=PATHS['translation_cache']
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    model.save_pretrained(output_dir)
+    print(f"ONNX model saved to {output_dir}")
+    return output_dir
+
+
+def load_onnx_model(model_name: str = None):
+    """Load the exported ONNX model, exporting it first if no export exists yet"""
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    model_name = model_name or MODEL_CONFIG['translation_model']
+    model_dir = onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(model_dir, "config.json")):
+        export_onnx_model(model_name, model_dir)
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if MODEL_CONFIG['onnx_intra_op_threads']:
+        session_options.intra_op_num_threads = MODEL_CONFIG['onnx_intra_op_threads']
+
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        use_cache=True,
+        provider="CPUExecutionProvider",
+        session_options=session_options
+    )
+
+
+if __name__ == "__main__":
+    if not is_onnx_available():
+        print("❌ ONNX Runtime backend needs: pip install onnxruntime optimum")
+    else:
+        export_onnx_model()
@@ -0,0 +1,119 @@
+"""
+Quality and speed check for the dynamic int8 CPU translation mode.
+Translates a reference set with the fp32 model and the int8-quantized model
+and compares the outputs.
+"""
+
+import time
+from collections import Counter
+from typing import Dict, List
+
+import torch
+
+from config import MODEL_CONFIG
+from translate_text import TextTranslator
+
+# Short, varied sentences similar to interactive traffic
+REFERENCE_SENTENCES = [
+    "Hello, how are you today?",
+    "Good morning, I hope you have a great day!",
+    "Technology is advancing rapidly.",
+    "The weather is beautiful today.",
+    "Thank you for your help.",
+    "Please save your work before closing the application.",
+    "The meeting has been moved to Thursday afternoon.",
+    "Could you tell me where the nearest train station is?",
+    "Your order has been shipped and will arrive in three days.",
+    "We could not find an account with that email address."
+]
+
+REFERENCE_TARGETS = ["Spanish", "French", "German", "Hindi", "Chinese"]
+
+
+def chrf(hypothesis: str, reference: str, max_order: int = 6, beta: float = 2.0) -> float:
+    """Character n-gram F-score between a hypothesis and a reference (0.0 - 1.0)"""
+    hypothesis = hypothesis.replace(" ", "")
+    reference = reference.replace(" ", "")
+    if hypothesis == reference:
+        return 1.0
+
+    precisions = []
+    recalls = []
+    for n in range(1, max_order + 1):
+        hyp_ngrams = Counter(hypothesis[i:i + n] for i in range(len(hypothesis) - n + 1))
+        ref_ngrams = Counter(reference[i:i + n] for i in range(len(reference) - n + 1))
+        if not hyp_ngrams or not ref_ngrams:
+            continue
+        overlap = sum((hyp_ngrams & ref_ngrams).values())
+        precisions.append(overlap / sum(hyp_ngrams.values()))
+        recalls.append(overlap / sum(ref_ngrams.values()))
+
+    if not precisions:
+        return 0.0
+    precision = sum(precisions) / len(precisions)
+    recall = sum(recalls) / len(recalls)
+    if precision + recall == 0:
+        return 0.0
+    return (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
+
+
+def _translate_all(translator: TextTranslator, sentences: List[str], targets: List[str]) -> Dict[str, List[str]]:
+    return {target: translator.batch_translate(sentences, target) for target in targets}
+
+
+def check_quantization_quality(sentences: List[str] = None, targets: List[str] = None,
+                               min_chrf: float = None) -> Dict[str, float]:
+    """Compare int8 CPU translations with fp32 CPU translations on a reference set"""
+    sentences = sentences or REFERENCE_SENTENCES
+    targets = targets or REFERENCE_TARGETS
+    min_chrf = min_chrf if min_chrf is not None else MODEL_CONFIG['quantization_min_chrf']
+
+    translator = TextTranslator()
+    translator.cache = None  # Measure the models, not the cache
+    translator.device = torch.device("cpu")
+    translator.fallback_to_cpu = True
+    if not translator.load_model():
+        raise RuntimeError("Could not load an fp32 CPU model for the quality check")
+    if translator.quantized:
+        raise RuntimeError("Disable MODEL_CONFIG['cpu_quantization'] to get an fp32 baseline")
+
+    fp32_params = sum(p.numel() * p.element_size() for p in translator.model.parameters())
+    start = time.time()
+    fp32_outputs = _translate_all(translator, sentences, targets)
+    fp32_time = time.time() - start
+
+    translator.quantize_for_cpu()
+    start = time.time()
+    int8_outputs = _translate_all(translator, sentences, targets)
+    int8_time = time.time() - start
+
+    scores = []
+    exact = 0
+    for target in targets:
+        for reference, hypothesis in zip(fp32_outputs[target], int8_outputs[target]):
+            scores.append(chrf(hypothesis, reference))
+            exact += hypothesis == reference
+
+    # Quantized linear weights are packed outside parameters(); what remains is embeddings and norms
+    int8_unquantized = sum(p.numel() * p.element_size() for p in translator.model.parameters())
+
+    mean_chrf = sum(scores) / len(scores)
+    return {
+        'mean_chrf': mean_chrf,
+        'min_chrf': min(scores),
+        'exact_match_rate': exact / len(scores),
+        'passed': mean_chrf >= min_chrf,
+        'fp32_seconds': fp32_time,
+        'int8_seconds': int8_time,
+        'speedup': fp32_time / int8_time if int8_time else 0.0,
+        'fp32_param_mb': fp32_params / 1024 ** 2,
+        'int8_unquantized_param_mb': int8_unquantized / 1024 ** 2
+    }
+
+
+if __name__ == "__main__":
+    print("=== Dynamic int8 quantization check ===\n")
+    report = check_quantization_quality()
+    for name, value in report.items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
+    print("\n✅ Quantized model within tolerance" if report['passed'] else "\n❌ Quantized model below chrF threshold")
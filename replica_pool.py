@@ -0,0 +1,265 @@
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Dict, List, Tuple
+
+import torch
+import torch.multiprocessing as mp
+
+from config import REPLICA_POOL_CONFIG
+from translate_text import BlockingTranslateMixin, TextTranslator
+
+
+def _available_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _worker_main(worker_id: int, model, tokenizer, cpu_set: List[int], num_threads: int, requests, results):
+    """Replica process: pin to its cores, wrap the inherited weights and serve requests"""
+    if cpu_set and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_set)
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed for this process
+
+    translator = TextTranslator()
+    translator.adopt_model(model, tokenizer, torch.device("cpu"))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, method, args = item
+        try:
+            results.put((worker_id, request_id, getattr(translator, method)(*args), None))
+        except Exception as e:
+            results.put((worker_id, request_id, None, f"{type(e).__name__}: {e}"))
+
+
+class TranslatorReplicaPool(BlockingTranslateMixin):
+    """Pool of translator processes sharing one copy of the M2M100 weights
+
+    The parent loads the model once on CPU and moves its tensors to shared
+    memory; workers inherit them (copy-on-write under fork, shared-memory
+    handles under spawn), pin themselves to a disjoint core set with their own
+    intra-op thread count, and receive requests from the least-loaded dispatch.
+    A monitor thread watches the replica processes: when one dies (OOM kill,
+    segfault) its pending requests fail and it is replaced, up to
+    ``max_respawns`` times, after which it no longer receives requests.
+    """
+
+    def __init__(self, num_workers: int = None, threads_per_worker: int = None, translator: TextTranslator = None):
+        cores = _available_cores()
+        self.threads_per_worker = threads_per_worker or REPLICA_POOL_CONFIG['threads_per_worker']
+        self.num_workers = num_workers or REPLICA_POOL_CONFIG['num_workers'] or max(1, len(cores) // self.threads_per_worker)
+        self.translator = translator or TextTranslator()
+
+        self._core_sets = [
+            cores[i * self.threads_per_worker:(i + 1) * self.threads_per_worker] if REPLICA_POOL_CONFIG['pin_cores'] else []
+            for i in range(self.num_workers)
+        ]
+        self._processes = []
+        self._request_queues = []
+        self._results = None
+        self._collector = None
+        self._monitor = None
+        self._context = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()  # Concurrent first dispatches must fork exactly one set of replicas
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[Future, int]] = {}  # request id -> (future, worker id)
+        self._in_flight = [0] * self.num_workers
+        self._completed = [0] * self.num_workers
+        self._respawns = [0] * self.num_workers
+        self._alive = [True] * self.num_workers
+        self._ids = itertools.count()
+
+    def start(self):
+        """Load the model once in this process and fork the replicas"""
+        with self._start_lock:
+            if self._processes:
+                return
+            self._start()
+
+    def _start(self):
+        translator = self.translator
+        # Replicas run on CPU cores; a translator already loaded on the GPU is moved first
+        if translator.is_loaded() and translator.device.type != "cpu":
+            print("Moving the translation model to CPU for the replica pool")
+            translator._migrate_to_cpu()
+        translator.device = torch.device("cpu")
+        translator.fallback_to_cpu = True
+        if not translator.load_model():
+            raise RuntimeError("Translation model is not available")
+
+        model = translator.model
+        if not translator.quantized:
+            # Quantized weights are packed outside regular tensors; fork still shares them copy-on-write
+            model.share_memory()
+
+        method = REPLICA_POOL_CONFIG['start_method']
+        if method is None:
+            method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        self._context = mp.get_context(method)
+
+        self._stopping.clear()
+        self._results = self._context.Queue()
+        with self._lock:
+            # Per-worker state starts from scratch, indexed like the replicas started below
+            self._in_flight = [0] * self.num_workers
+            self._completed = [0] * self.num_workers
+            self._respawns = [0] * self.num_workers
+            self._alive = [True] * self.num_workers
+        processes, request_queues = [], []
+        for worker_id in range(self.num_workers):
+            process, requests = self._spawn(worker_id)
+            processes.append(process)
+            request_queues.append(requests)
+        self._request_queues = request_queues
+        self._processes = processes  # Published last: dispatch treats a non-empty list as started
+
+        self._collector = threading.Thread(target=self._collect_results, name="replica-results", daemon=True)
+        self._collector.start()
+        self._monitor = threading.Thread(target=self._watch_workers, name="replica-monitor", daemon=True)
+        self._monitor.start()
+        print(f"Started {self.num_workers} translator replicas with {self.threads_per_worker} threads each")
+
+    def _spawn(self, worker_id: int):
+        """Start one replica process with its own request queue"""
+        requests = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.translator.model, self.translator.tokenizer, self._core_sets[worker_id],
+                  self.threads_per_worker, requests, self._results),
+            name=f"translator-replica-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process, requests
+
+    def _watch_workers(self):
+        """Fail the pending requests of replicas that died and replace them"""
+        interval = REPLICA_POOL_CONFIG['monitor_interval_seconds']
+        while not self._stopping.is_set():
+            with self._lock:
+                sentinels = {
+                    process.sentinel: worker_id
+                    for worker_id, process in enumerate(self._processes) if self._alive[worker_id]
+                }
+            for sentinel in wait(list(sentinels), timeout=interval):
+                if not self._stopping.is_set():
+                    self._replace_worker(sentinels[sentinel])
+
+    def _replace_worker(self, worker_id: int):
+        process = self._processes[worker_id]
+        print(f"Translator replica {worker_id} exited unexpectedly (exit code {process.exitcode})")
+        with self._lock:
+            lost = [request_id for request_id, (_, owner) in self._pending.items() if owner == worker_id]
+            futures = [self._pending.pop(request_id)[0] for request_id in lost]
+            self._in_flight[worker_id] = 0
+            respawn = self._respawns[worker_id] < REPLICA_POOL_CONFIG['max_respawns']
+            if respawn:
+                self._respawns[worker_id] += 1
+            else:
+                self._alive[worker_id] = False
+        for future in futures:
+            future.set_exception(RuntimeError(f"Translator replica {worker_id} died"))
+
+        if not respawn:
+            print(f"Translator replica {worker_id} is no longer used after {self._respawns[worker_id]} restarts")
+            return
+        try:
+            replacement, requests = self._spawn(worker_id)
+        except Exception as e:
+            print(f"Could not restart translator replica {worker_id}: {str(e)}")
+            with self._lock:
+                self._alive[worker_id] = False
+            return
+        with self._lock:
+            self._processes[worker_id] = replacement
+            self._request_queues[worker_id] = requests
+
+    def stop(self, timeout: float = None):
+        """Let replicas finish queued work and shut them down"""
+        with self._start_lock:
+            self._stopping.set()
+            if self._monitor is not None:
+                self._monitor.join(timeout)
+            for requests in self._request_queues:
+                requests.put(None)
+            for process in self._processes:
+                process.join(timeout)
+            if self._results is not None:
+                self._results.put(None)
+            if self._collector is not None:
+                self._collector.join(timeout)
+            with self._lock:
+                abandoned = [future for future, _ in self._pending.values()]
+                self._pending.clear()
+            for future in abandoned:
+                future.set_exception(RuntimeError("Translator replica pool was stopped"))
+            self._processes = []
+            self._request_queues = []
+            self._collector = None
+            self._monitor = None
+
+    def _dispatch(self, method: str, args: tuple) -> Future:
+        if not self._processes:
+            self.start()
+        future = Future()
+        with self._lock:
+            workers = [i for i in range(self.num_workers) if self._alive[i]]
+            if not workers:
+                raise RuntimeError("No translator replicas are running")
+            request_id = next(self._ids)
+            worker_id = min(workers, key=lambda i: self._in_flight[i])
+            self._in_flight[worker_id] += 1
+            self._pending[request_id] = (future, worker_id)
+            # Under the lock so a replacement queue cannot be swapped in between
+            self._request_queues[worker_id].put((request_id, method, args))
+        return future
+
+    def _collect_results(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                break
+            worker_id, request_id, result, error = item
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue  # Already failed because its replica died
+                future = entry[0]
+                self._in_flight[worker_id] -= 1
+                self._completed[worker_id] += 1
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def submit(self, text: str, target_language: str, source_language: str = "English") -> Future:
+        """Queue a translation on the least-loaded replica"""
+        return self._dispatch("translate_text", (text, target_language, source_language))
+
+    def submit_batch(self, texts: List[str], target_language: str, source_language: str = "English") -> Future:
+        """Queue a whole batch on the least-loaded replica"""
+        return self._dispatch("batch_translate", (texts, target_language, source_language))
+
+    def metrics(self) -> Dict[str, list]:
+        """Return per-replica in-flight and completed request counts"""
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'threads_per_worker': self.threads_per_worker,
+                'core_sets': [list(cores) for cores in self._core_sets],
+                'in_flight': list(self._in_flight),
+                'completed': list(self._completed),
+                'respawns': list(self._respawns),
+                'alive': list(self._alive)
+            }
@@ -0,0 +1,220 @@
+"""
+Deterministic speaker features for voice enrollment.
+Each sample is reduced to running log-mel statistics over its speech frames:
+frame count, per-band mean and per-band sum of squared deviations (M2).
+Statistics from any number of samples merge exactly, and the speaker
+embedding is the per-band mean followed by the per-band standard deviation.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from config import VOICE_EMBEDDING_CONFIG
+
+# (frame count, per-band mean, per-band M2)
+Statistics = Tuple[int, np.ndarray, np.ndarray]
+
+# Settings that affect how fast features are computed, not what they are
+_EXECUTION_KEYS = ('preprocess_workers',)
+
+# One process pool shared by every enrollment in this process
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def preprocessing_params() -> dict:
+    """Parameters that change the features; part of every cache key"""
+    return {key: value for key, value in VOICE_EMBEDDING_CONFIG.items() if key not in _EXECUTION_KEYS}
+
+
+def empty_statistics() -> Statistics:
+    n_mels = VOICE_EMBEDDING_CONFIG['n_mels']
+    return 0, np.zeros(n_mels), np.zeros(n_mels)
+
+
+def frame_statistics(frames: np.ndarray) -> Statistics:
+    """Statistics of a (num_frames, n_mels) block of log-mel frames"""
+    if len(frames) == 0:
+        return empty_statistics()
+    frames = frames.astype(np.float64)
+    mean = frames.mean(axis=0)
+    return len(frames), mean, ((frames - mean) ** 2).sum(axis=0)
+
+
+def combine_statistics(a: Statistics, b: Statistics) -> Statistics:
+    """Merge two sets of statistics exactly (Chan et al. parallel variance)"""
+    count_a, mean_a, m2_a = a
+    count_b, mean_b, m2_b = b
+    if count_a == 0:
+        return b
+    if count_b == 0:
+        return a
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (count_b / count)
+    m2 = m2_a + m2_b + delta ** 2 * (count_a * count_b / count)
+    return count, mean, m2
+
+
+def log_mel_frames(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Log-mel frames of peak-normalized audio, shaped (num_frames, n_mels)"""
+    mel = librosa.feature.melspectrogram(
+        y=audio,
+        sr=sample_rate,
+        n_fft=VOICE_EMBEDDING_CONFIG['n_fft'],
+        hop_length=VOICE_EMBEDDING_CONFIG['hop_length'],
+        n_mels=VOICE_EMBEDDING_CONFIG['n_mels']
+    )
+    return librosa.power_to_db(mel, ref=1.0).T
+
+
+def embedding_from_statistics(stats: Statistics) -> np.ndarray:
+    """Speaker embedding: per-band mean followed by per-band standard deviation"""
+    count, mean, m2 = stats
+    std = np.sqrt(m2 / count) if count else np.zeros_like(m2)
+    return np.concatenate([mean, std]).astype(np.float32)
+
+
+def statistics_from_embedding(embedding: np.ndarray, count: int) -> Statistics:
+    """Recover mergeable statistics from a stored embedding and its frame count"""
+    embedding = np.asarray(embedding, dtype=np.float64)
+    n_mels = VOICE_EMBEDDING_CONFIG['n_mels']
+    mean = embedding[:n_mels].copy()
+    return count, mean, embedding[n_mels:] ** 2 * count
+
+
+def sample_cache_key(path: str, streaming: bool = False) -> str:
+    """Hash of a sample's bytes plus the preprocessing parameters"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    params = dict(preprocessing_params(), streaming=streaming)
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def preprocess_audio(path: str) -> np.ndarray:
+    """Decode and resample one sample, peak-normalize it and trim leading and trailing silence"""
+    audio, _ = librosa.load(path, sr=VOICE_EMBEDDING_CONFIG['sample_rate'])
+    peak = np.max(np.abs(audio)) if len(audio) else 0.0
+    if peak > 0:
+        audio = audio / peak
+    audio, _ = librosa.effects.trim(audio, top_db=VOICE_EMBEDDING_CONFIG['top_db'])
+    return audio
+
+
+def sample_statistics(path: str) -> Statistics:
+    """Preprocess one sample and return its log-mel statistics"""
+    audio = preprocess_audio(path)
+    if len(audio) == 0:
+        return empty_statistics()
+    return frame_statistics(log_mel_frames(audio, VOICE_EMBEDDING_CONFIG['sample_rate']))
+
+
+def _mono_blocks(path: str):
+    """Yield (mono float32 block, sample rate) pairs of ``stream_block_seconds`` each"""
+    sample_rate = sf.info(path).samplerate
+    block_frames = int(VOICE_EMBEDDING_CONFIG['stream_block_seconds'] * sample_rate)
+    for block in sf.blocks(path, blocksize=block_frames, dtype='float32', always_2d=True):
+        yield block.mean(axis=1), sample_rate
+
+
+def _frame_rms_db(audio: np.ndarray) -> np.ndarray:
+    rms = librosa.feature.rms(
+        y=audio, frame_length=VOICE_EMBEDDING_CONFIG['n_fft'], hop_length=VOICE_EMBEDDING_CONFIG['hop_length']
+    )[0]
+    return librosa.amplitude_to_db(rms, ref=1.0)
+
+
+def stream_statistics(path: str) -> Statistics:
+    """Log-mel statistics of the speech in a recording of any length, in bounded memory
+
+    A first pass over the blocks finds the peak sample and the loudest frame,
+    matching the whole-file normalization of ``sample_statistics``. The second
+    pass resamples and normalizes one block at a time, keeps only frames within
+    ``top_db`` of the loudest one (an energy voice-activity gate that, unlike
+    trimming, also drops pauses inside the recording) and folds their
+    statistics into running totals. At most one block is decoded at a time.
+    """
+    peak = 0.0
+    loudest_db = -np.inf
+    for audio, _ in _mono_blocks(path):
+        if len(audio):
+            peak = max(peak, float(np.max(np.abs(audio))))
+            loudest_db = max(loudest_db, float(np.max(_frame_rms_db(audio))))
+    if peak == 0.0:
+        return empty_statistics()
+    # Frame energies above were measured before normalization
+    threshold_db = loudest_db - 20 * np.log10(peak) - VOICE_EMBEDDING_CONFIG['top_db']
+
+    target_rate = VOICE_EMBEDDING_CONFIG['sample_rate']
+    stats = empty_statistics()
+    for audio, sample_rate in _mono_blocks(path):
+        if sample_rate != target_rate:
+            audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=target_rate)
+        audio = audio / peak
+        if len(audio) < VOICE_EMBEDDING_CONFIG['n_fft']:
+            continue  # Trailing fragment shorter than one analysis window
+        frames = log_mel_frames(audio, target_rate)
+        speech = _frame_rms_db(audio)[:len(frames)] >= threshold_db
+        stats = combine_statistics(stats, frame_statistics(frames[speech]))
+    return stats
+
+
+def _worker_count() -> int:
+    return VOICE_EMBEDDING_CONFIG['preprocess_workers'] or os.cpu_count() or 1
+
+
+def _shared_executor() -> ProcessPoolExecutor:
+    """Create the shared pool on first use
+
+    Workers are spawned rather than forked: the app process already runs
+    threads (model pool reaper, background loads, torch) and may hold a CUDA
+    context, neither of which survives a fork safely.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=_worker_count(), mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next enrollment starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def parallel_sample_statistics(paths: List[str], streaming: bool = False) -> List[Statistics]:
+    """``sample_statistics`` (or ``stream_statistics``) for every path, fanned out over worker processes
+
+    All callers share one pool of ``preprocess_workers`` processes, so
+    concurrent enrollments queue for workers instead of each starting their
+    own. Results come back in input order regardless of which worker finishes
+    first, so anything reduced from them is deterministic.
+    """
+    statistics = stream_statistics if streaming else sample_statistics
+    if len(paths) <= 1 or _worker_count() <= 1:
+        return [statistics(path) for path in paths]
+    executor = _shared_executor()
+    try:
+        return list(executor.map(statistics, paths))
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
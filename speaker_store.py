@@ -0,0 +1,160 @@
+"""
+Multi-speaker embedding store.
+Embeddings live in one contiguous float32 file that is memory-mapped for
+reading, one row per speaker. A small append-only JSONL index maps speaker
+IDs to rows and metadata; the last line for an ID wins, so updates never
+rewrite the index. Lookups are a dict access and return a view into the map.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import PATHS, SPEAKER_STORE_CONFIG
+
+VECTORS_NAME = "vectors.f32"
+INDEX_NAME = "index.jsonl"
+LEGACY_EMBEDDING = "speaker_embedding.npy"
+
+
+class SpeakerStore:
+    """Speaker embeddings keyed by speaker ID in a memory-mapped array"""
+
+    def __init__(self, directory: str = None, embedding_dim: int = None):
+        self.directory = directory or PATHS['speakers_dir']
+        self.embedding_dim = embedding_dim or SPEAKER_STORE_CONFIG['embedding_dim']
+        self.vectors_path = os.path.join(self.directory, VECTORS_NAME)
+        self.index_path = os.path.join(self.directory, INDEX_NAME)
+        self._row_bytes = self.embedding_dim * np.dtype(np.float32).itemsize
+        self._lock = threading.Lock()
+        self._records: Dict[str, dict] = {}
+        self._rows = 0
+        self._vectors = None  # Read-only memmap over the first _mapped_rows rows
+        self._mapped_rows = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        self._repair_index()
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._records[record['speaker_id']] = record
+                self._rows = max(self._rows, record['row'] + 1)
+    
+    def _repair_index(self):
+        """Drop a torn final line left by an interrupted write, so the next append starts on its own line"""
+        with open(self.index_path, "r+b") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            f.truncate(data.rfind(b"\n") + 1)
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"Discarded an incomplete record at the end of {self.index_path}")
+
+    def _map(self, row: int) -> np.memmap:
+        """Return a memmap covering ``row``, remapping only after the file has grown"""
+        if self._vectors is None or row >= self._mapped_rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(self._rows, self.embedding_dim))
+            self._mapped_rows = self._rows
+        return self._vectors
+
+    def __contains__(self, speaker_id: str) -> bool:
+        return speaker_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def speaker_ids(self) -> List[str]:
+        return list(self._records)
+
+    def metadata(self, speaker_id: str) -> Optional[dict]:
+        """Return a speaker's index record (row, sample count, sample rate, timestamps)"""
+        record = self._records.get(speaker_id)
+        return dict(record) if record is not None else None
+
+    def get(self, speaker_id: str) -> Optional[np.ndarray]:
+        """Return a speaker's embedding as a read-only view into the memory map, or None"""
+        with self._lock:
+            record = self._records.get(speaker_id)
+            if record is None:
+                return None
+            return self._map(record['row'])[record['row']]
+
+    def put(self, speaker_id: str, embedding: np.ndarray, num_samples: int, sample_rate: int, **extra) -> dict:
+        """Store or replace a speaker's embedding; an existing speaker keeps its row"""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.embedding_dim:
+            raise ValueError(f"Expected a {self.embedding_dim}-dim embedding, got {vector.shape[0]}")
+
+        with self._lock:
+            previous = self._records.get(speaker_id)
+            row = previous['row'] if previous is not None else self._rows
+            now = time.time()
+
+            # Write the vector first; the index line below is what commits it
+            mode = "r+b" if os.path.exists(self.vectors_path) else "w+b"
+            with open(self.vectors_path, mode) as f:
+                f.seek(row * self._row_bytes)
+                f.write(vector.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            record = dict(extra)
+            record.update({
+                'speaker_id': speaker_id,
+                'row': row,
+                'num_samples': num_samples,
+                'sample_rate': sample_rate,
+                'created_at': previous['created_at'] if previous is not None else now,
+                'updated_at': now
+            })
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._records[speaker_id] = record
+            self._rows = max(self._rows, row + 1)
+            return dict(record)
+
+    def compact_index(self):
+        """Rewrite the index with one line per speaker"""
+        with self._lock:
+            temp_path = self.index_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for record in self._records.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.index_path)
+
+    def migrate_legacy(self, checkpoints_dir: str = None, speaker_id: str = None) -> bool:
+        """Import the old single pickled ``speaker_embedding.npy`` once, then rename it"""
+        legacy_path = os.path.join(checkpoints_dir or PATHS['checkpoints_dir'], LEGACY_EMBEDDING)
+        speaker_id = speaker_id or SPEAKER_STORE_CONFIG['default_speaker_id']
+        if not os.path.exists(legacy_path):
+            return False
+        try:
+            # The legacy format is a pickled dict; this is the only place it is unpickled
+            legacy = np.load(legacy_path, allow_pickle=True).item()
+            if speaker_id not in self:
+                self.put(speaker_id, legacy['embedding'], legacy.get('num_samples', 0),
+                         legacy.get('sample_rate', 24000), migrated_from=LEGACY_EMBEDDING)
+            os.replace(legacy_path, legacy_path + ".migrated")
+            print(f"Migrated legacy speaker embedding to speaker '{speaker_id}'")
+            return True
+        except Exception as e:
+            print(f"Could not migrate legacy speaker embedding: {str(e)}")
+            return False
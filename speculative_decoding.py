@@ -0,0 +1,134 @@
+"""
+Speculative (assisted) decoding support for TextTranslator.
+A small draft model that shares M2M100's vocabulary proposes several tokens
+which the full model verifies in one forward pass, so greedy output is
+unchanged. Draft models are configured per language pair and acceptance is
+measured with forward hooks counting target and draft calls.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import torch
+from transformers import M2M100ForConditionalGeneration
+
+from config import PATHS, SPECULATIVE_CONFIG
+
+# Counters for the speculative call running on this thread; shared models are
+# used by many threads at once, so hooks only count while a call is measured
+_measuring = threading.local()
+_attach_lock = threading.Lock()
+
+
+def _count_call(module, inputs, outputs):
+    record = getattr(_measuring, 'record', None)
+    if record is not None:
+        role = module._speculation_role
+        record[role] = record.get(role, 0) + 1
+
+
+def attach_call_counter(model, role: str):
+    """Register (once) a forward hook that counts calls of ``model`` as ``role`` on measuring threads"""
+    with _attach_lock:
+        if getattr(model, '_speculation_role', None) is None:
+            model._speculation_role = role
+            model.register_forward_hook(_count_call)
+
+
+@contextmanager
+def measure_calls():
+    """Count forward calls made by this thread; yields a {'target': n, 'draft': n} dict"""
+    record = {}
+    previous = getattr(_measuring, 'record', None)
+    _measuring.record = record
+    try:
+        yield record
+    finally:
+        _measuring.record = previous
+
+
+class DraftModels:
+    """Lazily loaded draft models per language pair, with acceptance statistics"""
+
+    def __init__(self, draft_models: Dict[str, str] = None, num_assistant_tokens: int = None):
+        self.draft_models = draft_models if draft_models is not None else SPECULATIVE_CONFIG['draft_models']
+        self.num_assistant_tokens = num_assistant_tokens or SPECULATIVE_CONFIG['num_assistant_tokens']
+        self._lock = threading.Lock()
+        self._models = {}  # draft name -> model, or None if it failed to load
+        self._stats = {}  # 'src-tgt' -> counters
+
+    def configured(self, src_lang: str, tgt_lang: str) -> bool:
+        return f"{src_lang}-{tgt_lang}" in self.draft_models
+
+    def get(self, src_lang: str, tgt_lang: str, device: torch.device, dtype: torch.dtype):
+        """Return the draft model for a pair on the target model's device, or None"""
+        name = self.draft_models.get(f"{src_lang}-{tgt_lang}")
+        if name is None:
+            return None
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._load(name, device, dtype)
+            draft = self._models[name]
+            if draft is not None and (draft.device.type != device.type or draft.dtype != dtype):
+                # Follow the target model, e.g. after a GPU -> CPU failover
+                draft = self._models[name] = draft.to(device=device, dtype=dtype)
+            return draft
+
+    def _load(self, name: str, device: torch.device, dtype: torch.dtype):
+        try:
+            print(f"Loading draft translation model: {name}")
+            draft = M2M100ForConditionalGeneration.from_pretrained(
+                name,
+                cache_dir=PATHS['translation_cache'],
+                torch_dtype=dtype,
+                low_cpu_mem_usage=True
+            ).to(device)
+            draft.eval()
+            draft.generation_config.num_assistant_tokens = self.num_assistant_tokens
+            draft.generation_config.num_assistant_tokens_schedule = "constant"
+            attach_call_counter(draft, 'draft')
+            return draft
+        except Exception as e:
+            print(f"Could not load draft model {name} ({e}); decoding without it")
+            return None
+
+    def record(self, src_lang: str, tgt_lang: str, calls: Dict[str, int], new_tokens: int):
+        """Fold one speculative generate call into the pair's acceptance statistics
+
+        Every target forward pass yields exactly one token of its own, so the
+        remaining new tokens are accepted draft proposals; each draft forward
+        pass proposes one token.
+        """
+        target_calls = calls.get('target', 0)
+        draft_calls = calls.get('draft', 0)
+        with self._lock:
+            stats = self._stats.setdefault(f"{src_lang}-{tgt_lang}", {
+                'calls': 0, 'new_tokens': 0, 'target_forwards': 0, 'draft_tokens': 0, 'accepted_tokens': 0
+            })
+            stats['calls'] += 1
+            stats['new_tokens'] += new_tokens
+            stats['target_forwards'] += target_calls
+            stats['draft_tokens'] += draft_calls
+            stats['accepted_tokens'] += max(0, new_tokens - target_calls)
+
+    def acceptance_rate(self, src_lang: str, tgt_lang: str) -> Optional[float]:
+        with self._lock:
+            stats = self._stats.get(f"{src_lang}-{tgt_lang}")
+            if not stats or not stats['draft_tokens']:
+                return None
+            return stats['accepted_tokens'] / stats['draft_tokens']
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-pair counters with acceptance rate and tokens per target forward pass"""
+        with self._lock:
+            report = {}
+            for pair, stats in self._stats.items():
+                report[pair] = dict(
+                    stats,
+                    acceptance_rate=stats['accepted_tokens'] / stats['draft_tokens'] if stats['draft_tokens'] else 0.0,
+                    tokens_per_target_forward=(
+                        stats['new_tokens'] / stats['target_forwards'] if stats['target_forwards'] else 0.0
+                    )
+                )
+            return report
@@ -6,6 +6,7 @@ Tests translation functionality with GPU fallback handling
 
 import time
 import torch
+from concurrent.futures import ThreadPoolExecutor
 from translate_text import TextTranslator
 
 def test_translation_performance():
@@ -73,5 +74,50 @@ def test_translation_performance():
     
     print("\n✅ Performance test completed!")
 
+def test_concurrent_translation(num_threads: int = 16, rounds: int = 4):
+    """Stress test: one shared translator serving many threads with different source languages"""
+    print("\n=== Concurrent Translation Stress Test ===\n")
+    
+    translator = TextTranslator()
+    translator.cache = None  # Every call must reach the model
+    if not translator.load_model():
+        print("❌ Could not load translation model")
+        return False
+    
+    # Mixed source languages catch any shared tokenizer/device state between threads
+    test_cases = [
+        ("Hello, how are you today?", "English", "Spanish"),
+        ("Bonjour, comment allez-vous aujourd'hui ?", "French", "English"),
+        ("Guten Morgen, ich hoffe, Sie haben einen schönen Tag!", "German", "Italian"),
+        ("Muchas gracias por tu ayuda.", "Spanish", "German"),
+        ("Доброе утро, как дела?", "Russian", "English"),
+        ("今日はいい天気ですね。", "Japanese", "French")
+    ]
+    
+    # Sequential reference results
+    expected = [translator.translate_text(text, target, source) for text, source, target in test_cases]
+    
+    jobs = [case_index for _ in range(rounds) for case_index in range(len(test_cases))] * num_threads
+    
+    def run(case_index):
+        text, source, target = test_cases[case_index]
+        return case_index, translator.translate_text(text, target, source)
+    
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = list(executor.map(run, jobs))
+    elapsed = time.time() - start_time
+    
+    mismatches = [(i, result) for i, result in results if result != expected[i]]
+    print(f"⏱️ {len(jobs)} translations on {num_threads} threads in {elapsed:.2f} seconds")
+    print(f"Device used: {translator.device}")
+    if mismatches:
+        print(f"❌ {len(mismatches)} results differ from sequential translation, e.g. {mismatches[0]}")
+        return False
+    
+    print("✅ All concurrent results match sequential translation")
+    return True
+
 if __name__ == "__main__":
     test_translation_performance()
+    test_concurrent_translation()
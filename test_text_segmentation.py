@@ -0,0 +1,80 @@
+"""
+Tests for sentence segmentation and reassembly
+Run with: python -m pytest test_text_segmentation.py
+"""
+
+from text_segmentation import join_sentences, split_sentences
+
+
+def rejoin(pieces, lang: str = 'en') -> str:
+    return join_sentences([sentence for sentence, _ in pieces], [separator for _, separator in pieces], lang)
+
+
+def test_splits_on_terminators_and_keeps_separators():
+    pieces = split_sentences("Hello there. How are you? Fine!")
+    assert [sentence for sentence, _ in pieces] == ["Hello there.", "How are you?", "Fine!"]
+    assert rejoin(pieces) == "Hello there. How are you? Fine!"
+
+
+def test_abbreviations_and_initials_do_not_end_sentences():
+    pieces = split_sentences("Dr. Smith met J. Doe at 5 p.m. today. They talked.")
+    assert [sentence for sentence, _ in pieces][-1] == "They talked."
+    assert pieces[0][0].startswith("Dr. Smith met J. Doe")
+
+
+def test_language_specific_abbreviations():
+    pieces = split_sentences("Das ist z.B. gut. Ja.", 'de')
+    assert [sentence for sentence, _ in pieces] == ["Das ist z.B. gut.", "Ja."]
+
+
+def test_full_width_terminators_split_without_whitespace():
+    text = "你好。我很好！谢谢。"
+    pieces = split_sentences(text, 'zh')
+    assert [sentence for sentence, _ in pieces] == ["你好。", "我很好！", "谢谢。"]
+    assert rejoin(pieces, 'zh') == text
+
+
+def test_line_breaks_are_preserved():
+    pieces = split_sentences("First line.\nSecond line.\n\nThird.")
+    assert rejoin(pieces) == "First line.\nSecond line.\n\nThird."
+
+
+def test_spaced_target_gets_spaces_between_cjk_sentences():
+    pieces = split_sentences("你好。谢谢。", 'zh')
+    assert join_sentences(["Hello.", "Thanks."], [separator for _, separator in pieces], 'en') == "Hello. Thanks."
+
+
+def test_long_sentence_splits_at_clauses_then_words():
+    text = "This clause is fine, and so is this one, but together they are too long."
+    pieces = split_sentences(text, 'en', max_chars=30)
+    assert all(len(sentence) <= 30 for sentence, _ in pieces)
+    assert pieces[0][0] == "This clause is fine,"
+    assert rejoin(pieces) == text
+
+
+def test_hard_split_words_rejoin_without_spaces():
+    text = "Supercalifragilisticexpialidocious is long."
+    pieces = split_sentences(text, 'en', max_chars=10)
+    assert all(len(sentence) <= 10 for sentence, _ in pieces)
+    assert rejoin(pieces) == text
+
+
+def test_unspaced_scripts_fall_back_to_character_splits():
+    text = "这是一个没有任何标点符号的非常长的句子"
+    pieces = split_sentences(text, 'zh', max_chars=6)
+    assert all(len(sentence) <= 6 for sentence, _ in pieces)
+    assert rejoin(pieces, 'zh') == text
+
+
+def test_token_limit_splits_pieces_that_fit_in_characters():
+    # One "token" per character stands in for a tokenizer on a dense script
+    text = "ありがとうございます、本当に助かりました"
+    pieces = split_sentences(text, 'ja', max_chars=1000, max_tokens=8, count_tokens=len)
+    assert all(len(sentence) <= 8 for sentence, _ in pieces)
+    assert rejoin(pieces, 'ja') == text
+
+
+def test_empty_and_whitespace_input():
+    assert split_sentences("") == []
+    assert split_sentences("   \n  ") == []
+    assert join_sentences([], []) == ""
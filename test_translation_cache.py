@@ -0,0 +1,152 @@
+"""
+Tests for the two-tier translation cache
+Run with: python -m pytest test_translation_cache.py
+"""
+
+import pytest
+
+import translation_cache
+from translation_cache import TranslationCache, normalize_text
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(translation_cache.time, "time", fake.time)
+    return fake
+
+
+def make_cache(tmp_path, **kwargs) -> TranslationCache:
+    options = dict(max_memory_entries=100, max_disk_entries=1000, ttl_seconds=None)
+    options.update(kwargs)
+    return TranslationCache(cache_dir=str(tmp_path), **options)
+
+
+def test_normalize_text_collapses_whitespace_and_unicode_forms():
+    assert normalize_text("  Hello \t  world\n") == "Hello world"
+    # Decomposed "é" (e + combining acute) matches the precomposed form
+    assert normalize_text("cafe\u0301") == normalize_text("caf\u00e9")
+
+
+def test_make_key_ignores_trivial_text_differences():
+    params = {'num_beams': 5}
+    key = TranslationCache.make_key("m2m", "en", "es", "Hello  world", params)
+    assert key == TranslationCache.make_key("m2m", "en", "es", " Hello world ", params)
+
+
+def test_make_key_separates_models_pairs_and_params():
+    base = TranslationCache.make_key("m2m", "en", "es", "Hello", {'num_beams': 5})
+    assert base != TranslationCache.make_key("m2m+int8", "en", "es", "Hello", {'num_beams': 5})
+    assert base != TranslationCache.make_key("m2m", "en", "fr", "Hello", {'num_beams': 5})
+    assert base != TranslationCache.make_key("m2m", "en", "es", "Hello", {'num_beams': 1})
+    # Parameter order does not matter
+    assert (TranslationCache.make_key("m2m", "en", "es", "Hi", {'a': 1, 'b': 2})
+            == TranslationCache.make_key("m2m", "en", "es", "Hi", {'b': 2, 'a': 1}))
+
+
+def test_round_trip_and_miss_counters(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k1", "Hola")
+    assert cache.get("k1") == "Hola"
+    assert cache.get("missing") is None
+    assert cache.get_many(["k1", "missing", "k1"]) == {"k1": "Hola"}
+
+    stats = cache.stats()
+    assert stats['memory_hits'] == 2
+    assert stats['misses'] == 2
+    cache.close()
+
+
+def test_memory_lru_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_memory_entries=2)
+    cache.put_many([("a", "A"), ("b", "B")])
+    assert cache.get("a") == "A"  # "a" is now more recent than "b"
+    cache.put("c", "C")
+
+    assert list(cache._memory) == ["a", "c"]
+    # The evicted entry is still served from disk and promoted back into memory
+    assert cache.get("b") == "B"
+    assert cache.stats()['disk_hits'] == 1
+    assert "b" in cache._memory
+    cache.close()
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", "Bonjour")
+    cache.close()
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get("k") == "Bonjour"
+    assert reopened.stats()['disk_hits'] == 1
+    reopened.close()
+
+
+def test_ttl_expires_entries_in_both_tiers(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.put("k", "Hallo")
+    clock.now += 30
+    assert cache.get("k") == "Hallo"
+
+    clock.now += 31
+    assert cache.get("k") is None
+    assert "k" not in cache._memory
+
+    cache.prune()
+    assert cache.stats()['disk_entries'] == 0
+    cache.close()
+
+
+def test_prune_keeps_only_the_newest_disk_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, max_memory_entries=1, max_disk_entries=2)
+    for i in range(4):
+        cache.put(f"k{i}", f"v{i}")
+        clock.now += 1
+    cache.prune()
+
+    assert cache.stats()['disk_entries'] == 2
+    cache._memory.clear()
+    assert cache.get_many(["k0", "k1", "k2", "k3"]) == {"k2": "v2", "k3": "v3"}
+    cache.close()
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many([("a", "A"), ("b", "B")])
+    cache.clear()
+    assert cache.get_many(["a", "b"]) == {}
+    assert cache.stats()['memory_entries'] == 0
+    cache.close()
+
+
+def test_unusable_cache_dir_degrades_to_memory_only(tmp_path):
+    not_a_dir = tmp_path / "cache"
+    not_a_dir.write_text("")
+    cache = make_cache(not_a_dir)
+    cache.put("k", "Hola")
+    assert cache.get("k") == "Hola"
+    assert cache.get("missing") is None
+    assert cache.stats()['misses'] == 1
+    cache.close()
+
+
+def test_unopenable_database_is_treated_as_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    # A directory where the database file should be makes every SQLite call fail
+    (tmp_path / translation_cache.CACHE_CONFIG['db_filename']).mkdir()
+    assert cache.get_many(["a", "b"]) == {}
+    assert cache.stats()['misses'] == 2
+    cache.put_many([("a", "A")])
+    assert cache.get("a") == "A"
+    cache.prune()
+    cache.clear()
+    assert cache.get("a") is None
+    cache.close()
@@ -0,0 +1,161 @@
+import re
+from typing import Callable, List, Tuple
+
+# Languages written without spaces between sentences
+NO_SPACE_LANGUAGES = {'zh', 'ja'}
+
+# Closing quotes and brackets that belong to the sentence they end
+_CLOSERS = '"\'”’»)\\]}」』'
+
+# Terminators that need trailing whitespace to count (Latin, Cyrillic, Indic danda,
+# Arabic/Urdu) and full-width terminators that end a sentence on their own
+_BOUNDARY = re.compile(
+    rf'(?:[.!?…।॥؟۔]+[{_CLOSERS}]*(?=\s|$)|[。！？]+[{_CLOSERS}]*)(\s*)'
+)
+
+_LINE_BREAK = re.compile(r'(\s*\n\s*)')
+
+_CLAUSE = re.compile(r'.+?(?:[,;:，、；]\s*|$)', re.S)
+
+_WORD = re.compile(r'\S+\s*')
+
+# Abbreviations that end in a period without ending the sentence
+_ABBREVIATIONS = {
+    'en': {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'no', 'fig', 'approx', 'inc', 'ltd', 'co'},
+    'es': {'sr', 'sra', 'srta', 'dr', 'dra', 'ud', 'uds', 'etc', 'p.ej', 'núm', 'pág'},
+    'fr': {'m', 'mme', 'mlle', 'dr', 'pr', 'etc', 'p.ex', 'n°', 'cf'},
+    'de': {'hr', 'fr', 'dr', 'prof', 'bzw', 'z.b', 'usw', 'ca', 'nr', 'vgl', 'd.h'},
+    'it': {'sig', 'sig.ra', 'dott', 'prof', 'ecc', 'es'},
+    'pt': {'sr', 'sra', 'dr', 'dra', 'etc', 'ex'},
+    'nl': {'dhr', 'mevr', 'dr', 'prof', 'bijv', 'enz', 'o.a'},
+}
+
+
+def _ends_with_abbreviation(candidate: str, lang: str) -> bool:
+    """Check whether a period-terminated candidate ends with a known abbreviation or initial"""
+    match = re.search(r'(\S+)\.$', candidate)
+    if not match:
+        return False
+    word = match.group(1).lstrip('(\'"«“').lower()
+    if len(word) == 1 and word.isalpha():
+        return True  # Initials such as "J. Smith"
+    return word in _ABBREVIATIONS.get(lang, _ABBREVIATIONS['en'])
+
+
+def _hard_split(word: str, fits: Callable[[str], bool]) -> List[str]:
+    """Cut a word that is too long on its own into the longest prefixes that fit"""
+    parts = []
+    while word and not fits(word):
+        # Fitting is monotone in prefix length, so binary search the cut
+        low, high = 1, len(word) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(word[:middle]):
+                low = middle
+            else:
+                high = middle - 1
+        parts.append(word[:low])
+        word = word[low:]
+    if word:
+        parts.append(word)
+    return parts
+
+
+def _split_long(sentence: str, fits: Callable[[str], bool]) -> List[Tuple[str, str]]:
+    """Break a sentence that does not fit at clause punctuation, then words, then characters
+
+    Pieces cut inside a word get an empty separator so that ``join_sentences``
+    puts them back together without a space; every other piece keeps its
+    trailing whitespace, or a single space if there was none.
+    """
+    if fits(sentence):
+        return [(sentence, '')]
+
+    units = []  # (text, whether the text after it continues the same word)
+    for clause in _CLAUSE.findall(sentence):
+        if fits(clause):
+            units.append((clause, False))
+            continue
+        for word in _WORD.findall(clause) or [clause]:
+            # Scripts without spaces fall through to a hard character split
+            parts = _hard_split(word, fits)
+            units.extend((part, i < len(parts) - 1) for i, part in enumerate(parts))
+
+    chunks = []
+    current, cut = '', False
+    for unit, unit_cut in units:
+        if current and not fits(current + unit):
+            chunks.append((current, cut))
+            current = ''
+        current += unit
+        cut = unit_cut
+    if current:
+        chunks.append((current, cut))
+
+    pieces = []
+    for chunk, cut in chunks:
+        stripped = chunk.rstrip()
+        if stripped:
+            pieces.append((stripped, '' if cut else chunk[len(stripped):] or ' '))
+    if pieces:
+        pieces[-1] = (pieces[-1][0], '')
+    return pieces
+
+
+def split_sentences(text: str, lang: str = 'en', max_chars: int = None, max_tokens: int = None,
+                    count_tokens: Callable[[str], int] = None) -> List[Tuple[str, str]]:
+    """Split text into (sentence, separator) pairs
+
+    The separator is the whitespace that followed the sentence in the original
+    text, so the output can be reassembled with ``join_sentences``. Sentences
+    longer than ``max_chars`` characters, or than ``max_tokens`` as measured by
+    ``count_tokens``, are broken into smaller pieces.
+    """
+    def fits(piece: str) -> bool:
+        if max_chars is not None and len(piece) > max_chars:
+            return False
+        return max_tokens is None or count_tokens is None or count_tokens(piece) <= max_tokens
+
+    pieces = []
+    parts = _LINE_BREAK.split(text.strip())
+    for i in range(0, len(parts), 2):
+        line = parts[i]
+        line_break = parts[i + 1] if i + 1 < len(parts) else ''
+
+        start = 0
+        for match in _BOUNDARY.finditer(line):
+            candidate = line[start:match.start(1)].strip()
+            if not candidate or _ends_with_abbreviation(candidate, lang):
+                continue
+            sentence_pieces = _split_long(candidate, fits)
+            # An empty separator is reserved for pieces cut inside a word
+            sentence_pieces[-1] = (sentence_pieces[-1][0], match.group(1) or ' ')
+            pieces.extend(sentence_pieces)
+            start = match.end()
+
+        rest = line[start:].strip()
+        if rest:
+            pieces.extend(_split_long(rest, fits))
+
+        if pieces and line_break:
+            pieces[-1] = (pieces[-1][0], line_break)
+    return pieces
+
+
+def join_sentences(sentences: List[str], separators: List[str], lang: str = 'en') -> str:
+    """Reassemble translated sentences using the original separators, adapted to the target script
+
+    An empty separator marks a piece cut inside a word, which is rejoined
+    without a space.
+    """
+    output = []
+    last = len(sentences) - 1
+    for i, (sentence, separator) in enumerate(zip(sentences, separators)):
+        output.append(sentence)
+        if i == last:
+            continue
+        if '\n' in separator:
+            output.append(separator)
+        elif separator and lang not in NO_SPACE_LANGUAGES:
+            output.append(' ')
+    return ''.join(output)
@@ -1,15 +1,249 @@
 import torch
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
-from typing import Dict, List
+from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer, LogitsProcessor, LogitsProcessorList
+from transformers import MarianMTModel, MarianTokenizer
+from transformers.modeling_outputs import BaseModelOutput
+from typing import Dict, List, Optional, Tuple
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from config import MODEL_CONFIG, CACHE_CONFIG, SPECULATIVE_CONFIG, ROUTER_CONFIG, PATHS
+from translation_cache import TranslationCache
+from text_segmentation import split_sentences, join_sentences
+from onnx_backend import is_onnx_available, load_onnx_model
+from model_snapshot import snapshot_dir, read_manifest, load_snapshot, save_snapshot
+from device_manager import DeviceManager, record_cuda_failure
+from model_pool import ModelPool
+from vocab_shortlist import VocabularyShortlists, install_shortlist_head, restrict_vocabulary
+from speculative_decoding import DraftModels, attach_call_counter, measure_calls
+
+
+def _bucket_by_token_budget(order: List[int], lengths: List[int], max_batch_tokens: int) -> List[List[int]]:
+    """Group length-sorted indices into batches whose padded size fits the token budget"""
+    buckets = []
+    current = []
+    for idx in order:
+        # Inputs are sorted by length, so the newest row is always the longest
+        padded_tokens = (len(current) + 1) * lengths[idx]
+        if current and padded_tokens > max_batch_tokens:
+            buckets.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+class _ReadWriteLock:
+    """Many concurrent readers or one exclusive writer; waiting writers block new readers"""
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+    
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class PerRowForcedBOSLogitsProcessor(LogitsProcessor):
+    """Force a different first generated token (the target language) on every batch row
+    
+    ``bos_token_ids`` holds one token per input row; beams of the same row are
+    laid out consecutively by ``generate``, so ids are repeated ``num_beams`` times.
+    """
+    
+    def __init__(self, bos_token_ids: List[int], num_beams: int = 1):
+        self.bos_token_ids = torch.tensor(bos_token_ids, dtype=torch.long).repeat_interleave(num_beams)
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        if input_ids.shape[-1] == 1:
+            bos_token_ids = self.bos_token_ids.to(scores.device)
+            rows = torch.arange(scores.shape[0], device=scores.device)
+            forced = torch.full_like(scores, -float("inf"))
+            forced[rows, bos_token_ids] = 0
+            return forced
+        return scores
+
+
+def _repeating_rows(ids: torch.LongTensor, max_ngram: int, min_repeats: int) -> torch.BoolTensor:
+    """Flag rows whose last tokens are one n-gram (n <= max_ngram) repeated back to back min_repeats times"""
+    repeating = torch.zeros(ids.shape[0], dtype=torch.bool, device=ids.device)
+    for n in range(1, max_ngram + 1):
+        span = n * min_repeats
+        if ids.shape[-1] < span:
+            break
+        tail = ids[:, -span:].reshape(ids.shape[0], min_repeats, n)
+        repeating |= (tail == tail[:, -1:, :]).all(dim=2).all(dim=1)
+    return repeating
+
+
+class GenerationGuardLogitsProcessor(LogitsProcessor):
+    """Force EOS once a hypothesis exceeds its row's token budget or falls into a repetition loop
+    
+    ``max_new_tokens`` holds one budget per input row and is repeated across
+    beams like ``PerRowForcedBOSLogitsProcessor``. The first ``prefix_length``
+    decoder tokens (decoder start and target language) do not count.
+    """
+    
+    def __init__(self, max_new_tokens: List[int], num_beams: int, eos_token_id: int, prefix_length: int = 2,
+                 max_ngram: int = 0, min_repeats: int = 0):
+        self.max_new_tokens = torch.tensor(max_new_tokens, dtype=torch.long).repeat_interleave(num_beams)
+        self.eos_token_id = eos_token_id
+        self.prefix_length = prefix_length
+        self.max_ngram = max_ngram
+        self.min_repeats = min_repeats
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        generated = input_ids[:, self.prefix_length:]
+        if generated.shape[-1] == 0:
+            return scores
+        stop = generated.shape[-1] >= self.max_new_tokens.to(scores.device)
+        if self.max_ngram and self.min_repeats > 1:
+            stop |= _repeating_rows(generated, self.max_ngram, self.min_repeats)
+        if not stop.any():
+            return scores
+        scores = scores.masked_fill(stop.unsqueeze(1), -float("inf"))
+        scores[stop, self.eos_token_id] = 0
+        return scores
+
+
+class _LatencyHistory:
+    """Exponentially weighted latency of interactive generate calls
+    
+    Samples are keyed by decoding profile, input length bucket and batch rows
+    bucket, so a long multi-sentence call never stands in for a single
+    sentence. Samples not refreshed within ``reprobe_after`` seconds are
+    ignored, which lets a profile that was once too slow (e.g. on a cold
+    start) be tried and measured again.
+    """
+    
+    def __init__(self, alpha: float, reprobe_after: float):
+        self.alpha = alpha
+        self.reprobe_after = reprobe_after
+        self._lock = threading.Lock()
+        self._ewma = {}  # (profile, tokens bucket, rows bucket) -> (seconds, time of last sample)
+    
+    @staticmethod
+    def bucket(tokens: int) -> int:
+        """Round a token count up to a power of two"""
+        return 1 << max(0, tokens - 1).bit_length()
+    
+    def _fresh(self, sampled_at: float, now: float) -> bool:
+        return not self.reprobe_after or now - sampled_at <= self.reprobe_after
+    
+    def record(self, profile: str, tokens: int, rows: int, seconds: float):
+        key = (profile, self.bucket(tokens), self.bucket(rows))
+        now = time.monotonic()
+        with self._lock:
+            previous = self._ewma.get(key)
+            if previous is not None and self._fresh(previous[1], now):
+                seconds = previous[0] + self.alpha * (seconds - previous[0])
+            self._ewma[key] = (seconds, now)
+    
+    def estimate(self, profile: str, tokens: int, rows: int = 1) -> Optional[float]:
+        """Expected latency for a call this size, scaled from the nearest measured bucket if needed"""
+        wanted = (self.bucket(tokens), self.bucket(rows))
+        now = time.monotonic()
+        with self._lock:
+            measured = {
+                (t, r): latency for (name, t, r), (latency, sampled_at) in self._ewma.items()
+                if name == profile and self._fresh(sampled_at, now)
+            }
+        if not measured:
+            return None
+        if wanted in measured:
+            return measured[wanted]
+        # Decoding time grows roughly linearly with output (and so input) length and, conservatively, with rows
+        nearest = min(measured, key=lambda b: abs(math.log2(b[0] / wanted[0])) + abs(math.log2(b[1] / wanted[1])))
+        return measured[nearest] * (wanted[0] / nearest[0]) * (wanted[1] / nearest[1])
+    
+    def stats(self) -> Dict[str, float]:
+        """Return the latency history in milliseconds keyed by 'profile/tokens x rows'"""
+        with self._lock:
+            return {
+                f"{name}/{t}x{r}": 1000.0 * latency for (name, t, r), (latency, _) in sorted(self._ewma.items())
+            }
+
+
+class BlockingTranslateMixin:
+    """``translate_text`` for front ends whose ``submit`` returns a Future
+    
+    Unlike TextTranslator.translate_text this takes no ``profile`` or
+    ``deadline``; ``timeout`` bounds the wait for the result instead.
+    """
+    
+    def translate_text(self, text: str, target_language: str, source_language: str = "English",
+                       timeout: float = None) -> Optional[str]:
+        """Submit one translation and wait for it; returns None on failure or timeout"""
+        try:
+            return self.submit(text, target_language, source_language).result(timeout)
+        except Exception as e:
+            print(f"Error translating text: {str(e)}")
+            return None
+
 
 class TextTranslator:
+    # M2M100 frames inputs as [src_lang_id] + tokens + [eos] and starts every
+    # output with the decoder start token followed by the target-language token
+    source_framing_tokens = 2
+    decoder_prefix_tokens = 2
+    
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.fallback_to_cpu = False
+        self.device_manager = DeviceManager()
         self.model = None
         self.tokenizer = None
+        # Inference runs under the read side; loading, unloading and device
+        # migration take the write side so callers never see a half-moved model
+        self._model_lock = _ReadWriteLock()
+        self._load_lock = threading.Lock()
+        self._ready = False
         self.model_name = "facebook/m2m100_418M"
+        self.backend = MODEL_CONFIG['backend']
+        self.quantized = False
+        self.generation_params = {
+            'max_length': 512,
+            'num_beams': 5,
+            'early_stopping': True,
+            'do_sample': False
+        }
+        self.latency_history = _LatencyHistory(
+            MODEL_CONFIG['latency_ewma_alpha'], MODEL_CONFIG['latency_reprobe_seconds']
+        )
+        self.cache = TranslationCache() if CACHE_CONFIG['enabled'] else None
+        self.shortlists = VocabularyShortlists(self.model_name) if MODEL_CONFIG['vocab_shortlists'] else None
+        self.drafts = DraftModels() if SPECULATIVE_CONFIG['draft_models'] else None
         self.language_codes = {
             'English': 'en',
             'Spanish': 'es', 
@@ -50,53 +284,112 @@ class TextTranslator:
             'Icelandic': 'is'
         }
         
+    def is_loaded(self) -> bool:
+        """Check whether the model is fully loaded and ready for inference"""
+        return self._ready
+    
     def load_model(self) -> bool:
-        """Load the M2M100 translation model"""
+        """Load the M2M100 translation model (a no-op if it is already loaded)"""
+        with self._load_lock:
+            if self._ready:
+                return True
+            with self._model_lock.write():
+                self._ready = self._load_model()
+                return self._ready
+    
+    def adopt_model(self, model, tokenizer, device: torch.device):
+        """Use an already-loaded model and tokenizer (e.g. weights shared from another process)"""
+        with self._load_lock, self._model_lock.write():
+            self.model = model
+            self.tokenizer = tokenizer
+            self.device = device
+            self.fallback_to_cpu = device.type == "cpu"
+            self.quantized = any(
+                type(module).__module__.startswith("torch.ao.nn.quantized") for module in model.modules()
+            )
+            self._ready = True
+    
+    def _ensure_model(self):
+        """Load the model on first use; safe to call from many threads"""
+        if not self._ready and not self.load_model():
+            raise RuntimeError("Translation model is not available")
+    
+    @contextmanager
+    def _loaded_model(self):
+        """Hold the read side of the model lock on a loaded model
+        
+        ``unload_model`` may run between loading and taking the lock (registry
+        release, pool eviction), so readiness is checked again under the lock
+        and the model is reloaded if it went away.
+        """
+        for _ in range(3):
+            self._ensure_model()
+            stack = ExitStack()
+            stack.enter_context(self._model_lock.read())
+            if self._ready:
+                break
+            stack.close()
+        else:
+            raise RuntimeError("Translation model was unloaded before it could be used")
+        with stack:
+            yield self.model, self.device
+    
+    @contextmanager
+    def borrow_model(self):
+        """Use the model directly; loading, unloading and device migration wait until released"""
+        with self._loaded_model() as (model, device):
+            yield model, device
+    
+    def _load_model(self) -> bool:
+        """Load the model; callers hold the load lock and the write side of the model lock"""
         try:
             print(f"Loading translation model: {self.model_name}")
             print(f"Using device: {self.device}")
             
-            # Load tokenizer
-            self.tokenizer = M2M100Tokenizer.from_pretrained(
-                self.model_name,
-                cache_dir="models/translation"
-            )
+            if self.backend == 'onnx':
+                self.tokenizer = M2M100Tokenizer.from_pretrained(
+                    self.model_name,
+                    cache_dir="models/translation"
+                )
+                if self._load_onnx_model():
+                    print(f"Translation model loaded successfully with ONNX Runtime on {self.device}!")
+                    return True
+                self.backend = 'torch'
+            
+            if self.device.type == "cuda" and not self.fallback_to_cpu:
+                # The capability probe runs once per driver/torch version and is cached on disk
+                if self.device_manager.preferred_device().type != "cuda":
+                    print("GPU failed the capability probe; using CPU")
+                    self.fallback_to_cpu = True
+            if self.fallback_to_cpu:
+                self.device = torch.device("cpu")
+            dtype = torch.float16 if self.device.type == "cuda" else torch.float32
             
             # Load model with fallback handling
             try:
-                self.model = M2M100ForConditionalGeneration.from_pretrained(
-                    self.model_name,
-                    cache_dir="models/translation",
-                    torch_dtype=torch.float16 if self.device.type == "cuda" and not self.fallback_to_cpu else torch.float32
-                )
-                
-                if not self.fallback_to_cpu:
-                    self.model = self.model.to(self.device)
-                    # Test GPU compatibility with a small operation
-                    test_input = torch.tensor([[1, 2, 3]]).to(self.device)
-                    with torch.no_grad():
-                        _ = self.model.get_encoder()(test_input)
-                    print("GPU compatibility test passed!")
-                else:
-                    self.model = self.model.to("cpu")
-                    self.device = torch.device("cpu")
-                    
+                self._load_weights(dtype)
             except RuntimeError as e:
                 if "no kernel image is available" in str(e) or "CUDA error" in str(e):
                     print(f"GPU compatibility issue detected: {e}")
                     print("Falling back to CPU execution...")
+                    record_cuda_failure(str(e))
                     self.fallback_to_cpu = True
                     self.device = torch.device("cpu")
                     
-                    # Reload model on CPU
-                    self.model = M2M100ForConditionalGeneration.from_pretrained(
-                        self.model_name,
-                        cache_dir="models/translation",
-                        torch_dtype=torch.float32
-                    ).to("cpu")
+                    # Convert the already-loaded weights instead of reloading from disk
+                    if self.model is not None:
+                        self.model = self.model.to(device="cpu", dtype=torch.float32)
+                    else:
+                        self._load_weights(torch.float32)
                 else:
                     raise e
             
+            if self.device.type == "cpu" and MODEL_CONFIG['cpu_quantization'] == 'int8':
+                self._quantize_for_cpu()
+            
+            if self.shortlists is not None and not install_shortlist_head(self.model):
+                print("Output projection cannot be sliced; decoding over the full vocabulary")
+            
             print(f"Translation model loaded successfully on {self.device}!")
             return True
             
@@ -104,17 +397,418 @@ class TextTranslator:
             print(f"Error loading translation model: {str(e)}")
             return False
     
+    def unload_model(self):
+        """Release the model weights; they are reloaded on the next translation"""
+        with self._load_lock, self._model_lock.write():
+            # The tokenizer is small and callers may still be decoding with it
+            self._ready = False
+            self.model = None
+            self.quantized = False
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        print("Translation model unloaded")
+    
+    def _load_weights(self, dtype: torch.dtype):
+        """Load tokenizer and weights onto self.device, preferring a pre-converted snapshot"""
+        self.model = None
+        directory = snapshot_dir(self.model_name, dtype)
+        if MODEL_CONFIG['use_snapshots'] and read_manifest(directory) is not None:
+            print(f"Loading model snapshot from {directory}")
+            self.model, self.tokenizer = load_snapshot(directory, self.device)
+            return
+        
+        self.tokenizer = M2M100Tokenizer.from_pretrained(
+            self.model_name,
+            cache_dir="models/translation"
+        )
+        self.model = M2M100ForConditionalGeneration.from_pretrained(
+            self.model_name,
+            cache_dir="models/translation",
+            torch_dtype=dtype,
+            low_cpu_mem_usage=True
+        )
+        if MODEL_CONFIG['use_snapshots']:
+            try:
+                save_snapshot(self.model, self.tokenizer, self.model_name, dtype, directory)
+            except OSError as e:
+                print(f"Could not write model snapshot: {e}")
+        self.model = self.model.to(self.device)
+    
+    def _load_onnx_model(self) -> bool:
+        """Load the exported ONNX graphs, falling back to PyTorch if unavailable"""
+        if not is_onnx_available():
+            print("ONNX Runtime backend requested but onnxruntime/optimum are not installed; using PyTorch")
+            return False
+        try:
+            self.model = load_onnx_model(self.model_name)
+            self.device = torch.device("cpu")
+            return True
+        except Exception as e:
+            print(f"Could not load ONNX model ({e}); using PyTorch")
+            return False
+    
+    def quantize_for_cpu(self):
+        """Apply dynamic int8 quantization to the model's linear layers (CPU only)"""
+        with self._model_lock.write():
+            self._quantize_for_cpu()
+    
+    def _quantize_for_cpu(self):
+        if self.quantized:
+            return
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model.float(),
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        self.model.eval()
+        self.quantized = True
+        print("Applied dynamic int8 quantization to linear layers")
+    
     def get_supported_languages(self) -> List[str]:
         """Get list of supported languages"""
         return list(self.language_codes.keys())
     
-    def translate_text(self, text: str, target_language: str, source_language: str = "English") -> str:
-        """Translate text from source language to target language"""
-        try:
-            if self.model is None or self.tokenizer is None:
-                if not self.load_model():
-                    return None
+    def _generation_params(self, profile: str = None) -> Dict:
+        """Generation parameters for a named decoding profile (the default profile if None)"""
+        profiles = MODEL_CONFIG['decoding_profiles']
+        profile = profile or MODEL_CONFIG['default_decoding_profile']
+        if profile not in profiles:
+            raise ValueError(f"Unknown decoding profile '{profile}'; expected one of {list(profiles)}")
+        return dict(self.generation_params, **profiles[profile])
+    
+    def _estimate_tokens(self, text: str, src_lang: str) -> int:
+        """Framed token length of a segment, approximated from characters before the tokenizer loads"""
+        if self.tokenizer is not None:
+            return len(self._encode(text, src_lang))
+        return len(text) // 4 + 2
+    
+    def _profile_for_deadline(self, text: str, src_lang: str, deadline: float) -> str:
+        """Pick the highest-quality profile whose recorded latency for inputs this long fits the deadline
+        
+        Profiles without recent history are tried optimistically so that they get measured.
+        """
+        pieces = split_sentences(text, src_lang, MODEL_CONFIG['max_segment_chars'])
+        tokens = max((self._estimate_tokens(sentence, src_lang) for sentence, _ in pieces), default=2)
+        profiles = list(MODEL_CONFIG['decoding_profiles'])
+        for name in reversed(profiles):
+            estimate = self.latency_history.estimate(name, tokens, max(1, len(pieces)))
+            if estimate is None or estimate <= deadline:
+                return name
+        return profiles[0]
+    
+    def _cache_key(self, text: str, src_lang: str, tgt_lang: str, profile: str = None,
+                   generation_params: Dict = None) -> str:
+        """Cache key for a single translation with the given profile's decoding parameters
+        
+        Decoders that do not go through ``generate`` (e.g. the continuous
+        batching engine) pass their own ``generation_params`` instead. The key
+        names the backend and quantization actually in use, which loading may
+        change (ONNX falls back to PyTorch), so callers go through ``_cache_keys``.
+        """
+        if not self._ready:
+            raise RuntimeError("Cache keys depend on the loaded backend; load the model first")
+        model_id = self.model_name
+        if self.backend != 'torch':
+            model_id += f"+{self.backend}"
+        if self.quantized:
+            model_id += "+int8"
+        decoding_params = dict(
+            generation_params if generation_params is not None else self._generation_params(profile),
+            length_ratio=self._length_ratio(src_lang, tgt_lang),
+            length_slack=MODEL_CONFIG['length_slack_tokens'],
+            repetition=[MODEL_CONFIG['repetition_max_ngram'], MODEL_CONFIG['repetition_min_repeats']]
+        )
+        if self.shortlists is not None and self.backend == 'torch':
+            # A rebuilt shortlist can change the output, so the key names the one loaded
+            decoding_params['vocab_shortlist'] = [self.shortlists.version(tgt_lang), self.shortlists.max_fraction]
+        return TranslationCache.make_key(model_id, src_lang, tgt_lang, text, decoding_params)
+    
+    def _cache_keys(self, rows: List[Tuple[str, str, str]], profile: str = None,
+                    generation_params: Dict = None) -> List[str]:
+        """Cache keys for (text, src_lang, tgt_lang) rows against the loaded backend
+        
+        The read lock keeps a concurrent unload or reload from changing the
+        backend while the keys are built.
+        """
+        with self._loaded_model():
+            return [self._cache_key(text, src, tgt, profile, generation_params) for text, src, tgt in rows]
+    
+    def _length_ratio(self, src_lang: str, tgt_lang: str) -> float:
+        """Expected output/input token ratio for a language pair, most specific config entry first"""
+        ratios = MODEL_CONFIG['length_ratios']
+        for key in (f"{src_lang}-{tgt_lang}", f"*-{tgt_lang}", f"{src_lang}-*"):
+            if key in ratios:
+                return ratios[key]
+        return ratios.get('default', 2.0)
+    
+    def _length_budget(self, src_tokens: int, src_lang: str, tgt_lang: str) -> int:
+        """Most new tokens a translation of ``src_tokens`` source tokens may generate"""
+        budget = math.ceil(self._length_ratio(src_lang, tgt_lang) * src_tokens) + MODEL_CONFIG['length_slack_tokens']
+        # Leave room for the decoder prefix and EOS tokens
+        return max(1, min(budget, self.generation_params['max_length'] - self.decoder_prefix_tokens - 1))
+    
+    def _generation_guard(self, attention_mask: torch.Tensor, src_langs: List[str], tgt_langs: List[str],
+                          num_beams: int) -> Tuple[GenerationGuardLogitsProcessor, int]:
+        """Build the per-row length/repetition guard and the batch's max_length from source lengths"""
+        # Source lengths exclude the framing tokens
+        src_tokens = (attention_mask.sum(dim=1) - self.source_framing_tokens).tolist()
+        budgets = [
+            self._length_budget(tokens, src, tgt)
+            for tokens, src, tgt in zip(src_tokens, src_langs, tgt_langs)
+        ]
+        guard = GenerationGuardLogitsProcessor(
+            budgets,
+            num_beams,
+            self.tokenizer.eos_token_id,
+            prefix_length=self.decoder_prefix_tokens,
+            max_ngram=MODEL_CONFIG['repetition_max_ngram'],
+            min_repeats=MODEL_CONFIG['repetition_min_repeats']
+        )
+        return guard, max(budgets) + self.decoder_prefix_tokens + 1
+    
+    def _target_processors(self, tgt_langs: List[str], num_beams: int) -> List[LogitsProcessor]:
+        """Logits processors that select each row's output language"""
+        return [PerRowForcedBOSLogitsProcessor([self.tokenizer.get_lang_id(tgt) for tgt in tgt_langs], num_beams)]
+    
+    def _restricted_vocabulary(self, model, tgt_langs: List[str], input_ids: torch.Tensor):
+        """Context limiting decoding to the targets' shortlists, or a no-op using the full vocabulary"""
+        restriction = None
+        if self.shortlists is not None and self.backend == 'torch':
+            restriction = self.shortlists.restriction(tgt_langs, input_ids, model.config.vocab_size)
+        return restrict_vocabulary(model, restriction)
+    
+    def _run_with_cpu_fallback(self, step):
+        """Run ``step(model, device)`` under the model read lock, retrying once on CPU if the GPU fails"""
+        # Requests queued behind a failover wait for it rather than racing the migration
+        self.device_manager.wait_for_failover()
+        with self._loaded_model() as (model, device):
+            try:
+                with torch.no_grad():
+                    return step(model, device)
+            except RuntimeError as e:
+                if not ("no kernel image is available" in str(e) or "CUDA error" in str(e)):
+                    raise e
+                print(f"GPU execution failed: {e}")
+                reason = str(e)
+        
+        # The migration runs in the background once in-flight callers leave the model
+        self.device_manager.begin_failover(self._migrate_to_cpu, reason)
+        self.device_manager.wait_for_failover()
+        print("Retrying on CPU...")
+        with self._loaded_model() as (model, device), torch.no_grad():
+            return step(model, device)
+    
+    def _migrate_to_cpu(self):
+        """Move the model to CPU once, after every in-flight call has left the model"""
+        with self._model_lock.write():
+            if self.device.type == "cpu":
+                return  # Another caller already migrated
+            # Half precision is slow or unsupported on CPU
+            self.model = self.model.to(device="cpu", dtype=torch.float32)
+            self.device = torch.device("cpu")
+            self.fallback_to_cpu = True
+    
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def _split(self, text: str, src_lang: str) -> List[Tuple[str, str]]:
+        """Split text into sentences that each fit the model's input, measured in tokens"""
+        self._ensure_model()
+        return split_sentences(
+            text, src_lang, MODEL_CONFIG['max_segment_chars'],
+            max_tokens=MODEL_CONFIG['max_sequence_length'] - self.source_framing_tokens,
+            count_tokens=self._count_tokens
+        )
+    
+    def _truncate(self, ids: List[int]) -> List[int]:
+        """Last-resort cut for segments that did not go through ``_split``"""
+        max_tokens = MODEL_CONFIG['max_sequence_length'] - self.source_framing_tokens
+        if len(ids) > max_tokens:
+            print(f"Warning: segment of {len(ids)} tokens truncated to {max_tokens}")
+            return ids[:max_tokens]
+        return ids
+    
+    def _encode(self, text: str, src_lang: str) -> List[int]:
+        """Tokenize one segment for a given source language without touching tokenizer state"""
+        ids = self._truncate(self.tokenizer.encode(text, add_special_tokens=False))
+        # M2M100 inputs are framed as [src_lang_id] + tokens + [eos]
+        return [self.tokenizer.get_lang_id(src_lang)] + ids + [self.tokenizer.eos_token_id]
+    
+    def _generate(self, inputs: Dict[str, torch.Tensor], src_langs: List[str], tgt_langs: List[str],
+                  profile: str = None, record_latency: bool = False) -> List[torch.Tensor]:
+        """Run generation on tokenized inputs, forcing each row's target language
+        
+        Each row may generate at most its language pair's length ratio times its
+        source length, and hypotheses stuck in an n-gram loop are ended early.
+        With a greedy profile, rows whose language pair has a draft model are
+        decoded speculatively one at a time; the rest share one batch.
+        ``record_latency`` feeds the call into the history used for deadlines;
+        only interactive calls should, so bulk batches do not skew it.
+        """
+        profile = profile or MODEL_CONFIG['default_decoding_profile']
+        generation_params = self._generation_params(profile)
+        
+        speculative = []
+        if (self.drafts is not None and self.backend == 'torch'
+                and generation_params.get('num_beams', 1) == 1 and not generation_params.get('do_sample')):
+            speculative = [i for i, pair in enumerate(zip(src_langs, tgt_langs)) if self.drafts.configured(*pair)]
+        
+        def step(model, device):
+            if not speculative:
+                return self._generate_batch(model, device, inputs, src_langs, tgt_langs, generation_params)
+            results = [None] * len(tgt_langs)
+            for i in speculative:
+                results[i] = self._generate_speculative(
+                    model, device, inputs['input_ids'][i], inputs['attention_mask'][i],
+                    src_langs[i], tgt_langs[i], generation_params
+                )
+            batched = [i for i, result in enumerate(results) if result is None]
+            if batched:
+                index = torch.tensor(batched)
+                generated = self._generate_batch(
+                    model, device,
+                    {k: v.index_select(0, index) for k, v in inputs.items()},
+                    [src_langs[i] for i in batched], [tgt_langs[i] for i in batched],
+                    generation_params
+                )
+                for i, tokens in zip(batched, generated):
+                    results[i] = tokens
+            return results
+        
+        started = time.monotonic()
+        generated = self._run_with_cpu_fallback(step)
+        if record_latency:
+            self.latency_history.record(
+                profile, inputs['input_ids'].shape[1], inputs['input_ids'].shape[0], time.monotonic() - started
+            )
+        return generated
+    
+    def _generate_batch(self, model, device: torch.device, inputs: Dict[str, torch.Tensor], src_langs: List[str],
+                        tgt_langs: List[str], generation_params: Dict) -> torch.Tensor:
+        """Decode a padded batch with per-row target-language and length/repetition guards"""
+        num_beams = generation_params.get('num_beams', 1)
+        guard, max_length = self._generation_guard(inputs['attention_mask'], src_langs, tgt_langs, num_beams)
+        processors = self._target_processors(tgt_langs, num_beams) + [guard]
+        device_inputs = {k: v.to(device) for k, v in inputs.items()}
+        with self._restricted_vocabulary(model, tgt_langs, inputs['input_ids']):
+            return model.generate(
+                **device_inputs,
+                logits_processor=LogitsProcessorList(processors),
+                **dict(generation_params, max_length=max_length)
+            )
+    
+    def _generate_speculative(self, model, device: torch.device, input_ids: torch.Tensor,
+                              attention_mask: torch.Tensor, src_lang: str, tgt_lang: str,
+                              generation_params: Dict) -> Optional[torch.Tensor]:
+        """Greedy-decode one row with its pair's draft model proposing tokens; None if no draft is usable"""
+        draft = self.drafts.get(src_lang, tgt_lang, device, model.dtype)
+        if draft is None:
+            return None
+        attach_call_counter(model, 'target')
+        
+        # Assisted generation works on a single unpadded row
+        input_ids = input_ids[attention_mask.bool()].unsqueeze(0)
+        attention_mask = torch.ones_like(input_ids)
+        guard, max_length = self._generation_guard(attention_mask, [src_lang], [tgt_lang], 1)
+        processors = self._target_processors([tgt_lang], 1) + [guard]
+        with measure_calls() as calls, self._restricted_vocabulary(model, [tgt_lang], input_ids):
+            output = model.generate(
+                input_ids=input_ids.to(device),
+                attention_mask=attention_mask.to(device),
+                assistant_model=draft,
+                logits_processor=LogitsProcessorList(processors),
+                **dict(generation_params, max_length=max_length)
+            )
+        # Everything after the decoder start token came from the generation loop
+        self.drafts.record(src_lang, tgt_lang, calls, output.shape[-1] - 1)
+        return output[0]
+    
+    def _translate_rows(self, rows: List[Tuple[str, str, str]], max_batch_tokens: int = None,
+                        profile: str = None, record_latency: bool = False) -> List[str]:
+        """Translate (text, src_lang, tgt_lang) segments in length-bucketed, padded batches
+        
+        Rows may mix language pairs freely. Cached and duplicate rows are
+        resolved first; the remaining rows are sorted by token length and
+        grouped so that each padded batch stays within ``max_batch_tokens``.
+        Results are returned in input order.
+        """
+        # Cache keys name the loaded variant (e.g. int8), which is only known once loading finishes
+        keys = self._cache_keys(rows, profile)
+        resolved = self.cache.get_many(keys) if self.cache is not None else {}
+        pending = {}
+        for key, row in zip(keys, rows):
+            if key not in resolved and key not in pending:
+                pending[key] = row
+        
+        if pending:
+            if max_batch_tokens is None:
+                max_batch_tokens = MODEL_CONFIG['max_batch_tokens']
+            
+            pending_keys = list(pending.keys())
+            pending_rows = list(pending.values())
             
+            # Tokenize once without padding to get the true length of every segment
+            encoded = [self._encode(text, src) for text, src, _ in pending_rows]
+            lengths = [len(ids) for ids in encoded]
+            order = sorted(range(len(pending_rows)), key=lambda i: lengths[i])
+            
+            new_entries = []
+            for bucket in _bucket_by_token_budget(order, lengths, max_batch_tokens):
+                inputs = self.tokenizer.pad(
+                    {'input_ids': [encoded[i] for i in bucket]},
+                    return_tensors="pt"
+                )
+                generated_tokens = self._generate(
+                    dict(inputs),
+                    [pending_rows[i][1] for i in bucket],
+                    [pending_rows[i][2] for i in bucket],
+                    profile,
+                    record_latency
+                )
+                decoded = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+                for idx, translated in zip(bucket, decoded):
+                    resolved[pending_keys[idx]] = translated
+                    if translated:
+                        new_entries.append((pending_keys[idx], translated))
+            
+            if self.cache is not None:
+                self.cache.put_many(new_entries)
+        
+        return [resolved.get(key) or row[0] for key, row in zip(keys, rows)]
+    
+    def _translate_segmented(self, requests: List[Tuple[str, str, str]], max_batch_tokens: int = None,
+                             profile: str = None, record_latency: bool = False) -> List[str]:
+        """Split (text, src_lang, tgt_lang) requests into sentences, translate them as one batch and reassemble"""
+        segmented = [self._split(text, src) if src != tgt else [] for text, src, tgt in requests]
+        rows = [
+            (sentence, src, tgt)
+            for (_, src, tgt), pieces in zip(requests, segmented)
+            for sentence, _ in pieces
+        ]
+        translated = self._translate_rows(rows, max_batch_tokens, profile, record_latency) if rows else []
+        
+        results = []
+        position = 0
+        for (text, _, tgt), pieces in zip(requests, segmented):
+            if not pieces:
+                results.append(text)  # Nothing to translate or same language
+                continue
+            chunk = translated[position:position + len(pieces)]
+            position += len(pieces)
+            results.append(join_sentences(chunk, [separator for _, separator in pieces], tgt))
+        return results
+    
+    def translate_text(self, text: str, target_language: str, source_language: str = "English",
+                       profile: str = None, deadline: float = None) -> str:
+        """Translate text from source language to target language
+        
+        Long inputs are split into sentences which are translated together and
+        cached individually, so nothing is lost to the model's length limit.
+        ``profile`` names a decoding profile from MODEL_CONFIG; without one, a
+        ``deadline`` (latency budget in seconds) picks the best profile that
+        has historically finished inputs of this length in time.
+        """
+        try:
             # Get language codes
             src_lang = self.language_codes.get(source_language, 'en')
             tgt_lang = self.language_codes.get(target_language, 'en')
@@ -122,52 +816,12 @@ class TextTranslator:
             if src_lang == tgt_lang:
                 return text  # No translation needed
             
-            # Set source language
-            self.tokenizer.src_lang = src_lang
-            
-            # Tokenize input text
-            inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # Generate translation with error handling
-            try:
-                with torch.no_grad():
-                    generated_tokens = self.model.generate(
-                        **inputs,
-                        forced_bos_token_id=self.tokenizer.get_lang_id(tgt_lang),
-                        max_length=512,
-                        num_beams=5,
-                        early_stopping=True,
-                        do_sample=False
-                    )
-            except RuntimeError as e:
-                if "no kernel image is available" in str(e) or "CUDA error" in str(e):
-                    print(f"GPU execution failed: {e}")
-                    print("Retrying on CPU...")
-                    
-                    # Move everything to CPU
-                    self.model = self.model.to("cpu")
-                    self.device = torch.device("cpu")
-                    self.fallback_to_cpu = True
-                    
-                    # Retry on CPU
-                    inputs = {k: v.to("cpu") for k, v in inputs.items()}
-                    with torch.no_grad():
-                        generated_tokens = self.model.generate(
-                            **inputs,
-                            forced_bos_token_id=self.tokenizer.get_lang_id(tgt_lang),
-                            max_length=512,
-                            num_beams=5,
-                            early_stopping=True,
-                            do_sample=False
-                        )
-                else:
-                    raise e
+            if profile is None and deadline is not None:
+                profile = self._profile_for_deadline(text, src_lang, deadline)
             
-            # Decode translated text
-            translated_text = self.tokenizer.batch_decode(
-                generated_tokens, 
-                skip_special_tokens=True
+            # Only interactive single-text calls feed the latency history used for deadlines
+            translated_text = self._translate_segmented(
+                [(text, src_lang, tgt_lang)], profile=profile, record_latency=True
             )[0]
             
             print(f"Translated '{text}' from {source_language} to {target_language}: '{translated_text}'")
@@ -177,24 +831,146 @@ class TextTranslator:
             print(f"Error translating text: {str(e)}")
             return None
     
-    def batch_translate(self, texts: List[str], target_language: str, source_language: str = "English") -> List[str]:
-        """Translate multiple texts"""
+    def batch_translate(self, texts: List[str], target_language: str, source_language: str = "English",
+                        max_batch_tokens: int = None, profile: str = None) -> List[str]:
+        """Translate multiple texts, batching the sentences of all texts together"""
         try:
-            if self.model is None or self.tokenizer is None:
-                if not self.load_model():
-                    return []
+            if not texts:
+                return []
+            
+            src_lang = self.language_codes.get(source_language, 'en')
+            tgt_lang = self.language_codes.get(target_language, 'en')
             
-            translations = []
-            for text in texts:
-                translated = self.translate_text(text, target_language, source_language)
-                translations.append(translated if translated else text)
+            translations = self._translate_segmented(
+                [(text, src_lang, tgt_lang) for text in texts],
+                max_batch_tokens,
+                profile
+            )
             
+            print(f"Batch translated {len(texts)} texts from {source_language} to {target_language}")
             return translations
             
         except Exception as e:
             print(f"Error in batch translation: {str(e)}")
             return texts  # Return original texts if translation fails
     
+    def translate_mixed(self, requests: List[Tuple[str, str, str]], max_batch_tokens: int = None,
+                        profile: str = None) -> List[str]:
+        """Translate (text, source_language, target_language) requests that mix language pairs
+        
+        Every request shares the same padded batches regardless of its language
+        pair; a per-row logits processor forces each row's target language.
+        """
+        try:
+            if not requests:
+                return []
+            
+            coded = [
+                (text, self.language_codes.get(source, 'en'), self.language_codes.get(target, 'en'))
+                for text, source, target in requests
+            ]
+            return self._translate_segmented(coded, max_batch_tokens, profile)
+            
+        except Exception as e:
+            print(f"Error in mixed batch translation: {str(e)}")
+            return [text for text, _, _ in requests]  # Return original texts if translation fails
+    
+    def translate_to_many(self, text: str, target_languages: List[str],
+                          source_language: str = "English", profile: str = None) -> Dict[str, str]:
+        """Translate one text into several target languages
+        
+        The source sentences are encoded once; the encoder outputs are shared by
+        every target and all targets are decoded together as one batch, each row
+        starting with its own target-language token.
+        """
+        try:
+            src_lang = self.language_codes.get(source_language, 'en')
+            tgt_codes = {name: self.language_codes.get(name, 'en') for name in target_languages}
+            
+            # Splitting measures tokens and keys name the loaded variant, so the model loads first
+            pieces = self._split(text, src_lang)
+            sentences = [sentence for sentence, _ in pieces]
+            separators = [separator for _, separator in pieces]
+            
+            # Work out which (sentence, target) pairs still need the model
+            targets = sorted({code for code in tgt_codes.values() if code != src_lang})
+            pairs = [(i, tgt) for tgt in targets for i in range(len(sentences))]
+            keys = dict(zip(pairs, self._cache_keys(
+                [(sentences[i], src_lang, tgt) for i, tgt in pairs], profile
+            )))
+            resolved = self.cache.get_many(keys.values()) if self.cache is not None else {}
+            rows = [pair for pair, key in keys.items() if key not in resolved]
+            
+            if rows:
+                self._decode_shared_encoding(sentences, src_lang, rows, keys, resolved, profile)
+            
+            translations = {}
+            for name, tgt in tgt_codes.items():
+                if tgt == src_lang:
+                    translations[name] = text
+                elif not pieces:
+                    translations[name] = text
+                else:
+                    translated = [resolved.get(keys[(i, tgt)]) or sentence for i, sentence in enumerate(sentences)]
+                    translations[name] = join_sentences(translated, separators, tgt)
+            
+            print(f"Translated '{text}' from {source_language} into {len(translations)} languages")
+            return translations
+            
+        except Exception as e:
+            print(f"Error translating to multiple languages: {str(e)}")
+            return {}
+    
+    def _decode_shared_encoding(self, sentences: List[str], src_lang: str, rows: List, keys: Dict, resolved: Dict,
+                                profile: str = None):
+        """Encode the needed sentences once and decode every (sentence, target) row from it"""
+        needed = sorted({i for i, _ in rows})
+        position = {sentence_idx: pos for pos, sentence_idx in enumerate(needed)}
+        
+        inputs = self.tokenizer.pad(
+            {'input_ids': [self._encode(sentences[i], src_lang) for i in needed]},
+            return_tensors="pt"
+        )
+        src_len = inputs['input_ids'].shape[1]
+        generation_params = self._generation_params(profile)
+        num_beams = generation_params.get('num_beams', 1)
+        
+        # Rows share the source length, so the token budget bounds rows per decode batch
+        rows_per_batch = max(1, MODEL_CONFIG['max_batch_tokens'] // src_len)
+        
+        def step(model, device):
+            device_inputs = {k: v.to(device) for k, v in inputs.items()}
+            encoder_outputs = model.get_encoder()(**device_inputs)
+            hidden = encoder_outputs.last_hidden_state
+            generated = []
+            for start in range(0, len(rows), rows_per_batch):
+                batch_rows = rows[start:start + rows_per_batch]
+                index = torch.tensor([position[i] for i, _ in batch_rows], device=device)
+                tgt_langs = [tgt for _, tgt in batch_rows]
+                attention_mask = device_inputs['attention_mask'].index_select(0, index)
+                guard, max_length = self._generation_guard(
+                    attention_mask, [src_lang] * len(batch_rows), tgt_langs, num_beams
+                )
+                processors = self._target_processors(tgt_langs, num_beams) + [guard]
+                with self._restricted_vocabulary(model, tgt_langs, device_inputs['input_ids'].index_select(0, index)):
+                    generated.extend(model.generate(
+                        encoder_outputs=BaseModelOutput(last_hidden_state=hidden.index_select(0, index)),
+                        attention_mask=attention_mask,
+                        logits_processor=LogitsProcessorList(processors),
+                        **dict(generation_params, max_length=max_length)
+                    ))
+            return generated
+        
+        generated_tokens = self._run_with_cpu_fallback(step)
+        decoded = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+        new_entries = []
+        for row, translated in zip(rows, decoded):
+            resolved[keys[row]] = translated
+            if translated:
+                new_entries.append((keys[row], translated))
+        if self.cache is not None:
+            self.cache.put_many(new_entries)
+    
     def detect_language(self, text: str) -> str:
         """Simple language detection (placeholder implementation)"""
         # This is a simplified implementation
@@ -222,8 +998,193 @@ class TextTranslator:
             'model': self.model_name,
             'supported_languages': len(self.language_codes),
             'device': str(self.device),
-            'languages': self.language_codes
+            'backend': self.backend,
+            'languages': self.language_codes,
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'decoding_profiles': list(MODEL_CONFIG['decoding_profiles']),
+            'latency_ms': self.latency_history.stats(),
+            'vocab_shortlists': self.shortlists.stats() if self.shortlists is not None else None,
+            'speculative_decoding': self.drafts.stats() if self.drafts is not None else None
+        }
+
+
+class MarianTranslator(TextTranslator):
+    """Compact bilingual (Marian/opus-mt) model for one language pair behind the TextTranslator interface"""
+    
+    # Marian frames inputs as tokens + [eos] and starts outputs with the decoder start token only
+    source_framing_tokens = 1
+    decoder_prefix_tokens = 1
+    
+    def __init__(self, model_name: str, src_lang: str, tgt_lang: str):
+        super().__init__()
+        self.model_name = model_name
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang
+        self.backend = 'torch'
+        self.shortlists = None
+        self.drafts = None
+        self.language_codes = {
+            name: code for name, code in self.language_codes.items() if code in (src_lang, tgt_lang)
         }
+    
+    def _load_weights(self, dtype: torch.dtype):
+        self.model = None
+        self.tokenizer = MarianTokenizer.from_pretrained(self.model_name, cache_dir=PATHS['translation_cache'])
+        self.model = MarianMTModel.from_pretrained(
+            self.model_name,
+            cache_dir=PATHS['translation_cache'],
+            torch_dtype=dtype,
+            low_cpu_mem_usage=True
+        ).to(self.device)
+        self.model.eval()
+    
+    def _encode(self, text: str, src_lang: str) -> List[int]:
+        ids = self._truncate(self.tokenizer.encode(text, add_special_tokens=False))
+        return ids + [self.tokenizer.eos_token_id]
+    
+    def _target_processors(self, tgt_langs: List[str], num_beams: int) -> List[LogitsProcessor]:
+        return []  # The output language is fixed by the model
+
+
+class TranslationRouter:
+    """Route each language pair to a translator backend with the TextTranslator interface
+    
+    Hot pairs listed in ROUTER_CONFIG['routes'] go to compact bilingual
+    models; every other pair falls back to M2M100. Backends live in a
+    ModelPool that keeps them within a memory budget and unloads idle ones.
+    A bilingual model that is not resident is warmed in the background while
+    a resident M2M100 serves its requests.
+    """
+    
+    def __init__(self, routes: Dict[str, str] = None, fallback: TextTranslator = None, pool: ModelPool = None):
+        self.routes = routes if routes is not None else ROUTER_CONFIG['routes']
+        self.fallback = fallback or TextTranslator()
+        self.pool = pool or ModelPool()
+        self.pool.register(self.fallback.model_name, self.fallback)
+        self.language_codes = self.fallback.language_codes
+        self._lock = threading.Lock()
+        self._backends = {}  # model name -> bilingual backend
+    
+    @property
+    def device(self) -> torch.device:
+        return self.fallback.device
+    
+    @property
+    def fallback_to_cpu(self) -> bool:
+        return self.fallback.fallback_to_cpu
+    
+    def backend_for(self, source_language: str, target_language: str) -> TextTranslator:
+        """Return the (possibly not yet loaded) backend serving a language pair"""
+        src_lang = self.language_codes.get(source_language, 'en')
+        tgt_lang = self.language_codes.get(target_language, 'en')
+        model_name = self.routes.get(f"{src_lang}-{tgt_lang}")
+        if model_name is None:
+            return self.fallback
+        with self._lock:
+            backend = self._backends.get(model_name)
+            if backend is None:
+                backend = MarianTranslator(model_name, src_lang, tgt_lang)
+                backend.cache = self.fallback.cache  # One cache; keys already include the model name
+                self._backends[model_name] = self.pool.register(model_name, backend)
+            return backend
+    
+    def _pick(self, backend: TextTranslator) -> str:
+        """Name of the pooled model that should serve a request routed to ``backend``"""
+        fallback = self.fallback.model_name
+        if backend is self.fallback or self.pool.prefetch(backend.model_name):
+            return backend.model_name
+        # The bilingual model is warming up in the background
+        if self.pool.is_resident(fallback):
+            return fallback
+        if self.pool.load(backend.model_name):
+            return backend.model_name  # Nothing resident: the small model is the quicker load
+        print(f"Could not load {backend.model_name}; routing to {fallback}")
+        return fallback
+    
+    def load_model(self) -> bool:
+        """Load the M2M100 fallback, which serves every language pair"""
+        return self.pool.load(self.fallback.model_name)
+    
+    def is_loaded(self) -> bool:
+        return self.fallback.is_loaded()
+    
+    def unload_model(self):
+        """Unload every backend that is not serving a request and stop the pool's idle reaper"""
+        for name in [self.fallback.model_name] + list(self._backends):
+            self.pool.evict(name)
+        self.pool.close()
+    
+    def get_supported_languages(self) -> List[str]:
+        return self.fallback.get_supported_languages()
+    
+    def detect_language(self, text: str) -> str:
+        return self.fallback.detect_language(text)
+    
+    def translate_text(self, text: str, target_language: str, source_language: str = "English",
+                       profile: str = None, deadline: float = None) -> str:
+        """Translate text with the backend routed for its language pair"""
+        try:
+            with self.pool.use(self._pick(self.backend_for(source_language, target_language))) as backend:
+                return backend.translate_text(
+                    text, target_language, source_language, profile=profile, deadline=deadline
+                )
+        except RuntimeError as e:
+            print(f"Error translating text: {str(e)}")
+            return None
+    
+    def batch_translate(self, texts: List[str], target_language: str, source_language: str = "English",
+                        max_batch_tokens: int = None, profile: str = None) -> List[str]:
+        """Translate multiple texts of one language pair with its routed backend"""
+        try:
+            with self.pool.use(self._pick(self.backend_for(source_language, target_language))) as backend:
+                return backend.batch_translate(texts, target_language, source_language, max_batch_tokens, profile)
+        except RuntimeError as e:
+            print(f"Error in batch translation: {str(e)}")
+            return texts
+    
+    def translate_mixed(self, requests: List[Tuple[str, str, str]], max_batch_tokens: int = None,
+                        profile: str = None) -> List[str]:
+        """Translate (text, source_language, target_language) requests, one mixed batch per backend"""
+        groups = OrderedDict()
+        for i, (_, source, target) in enumerate(requests):
+            groups.setdefault(self._pick(self.backend_for(source, target)), []).append(i)
+        
+        results = [text for text, _, _ in requests]
+        for name, indices in groups.items():
+            try:
+                with self.pool.use(name) as backend:
+                    translated = backend.translate_mixed([requests[i] for i in indices], max_batch_tokens, profile)
+            except RuntimeError as e:
+                print(f"Error in mixed batch translation: {str(e)}")
+                continue
+            for i, translation in zip(indices, translated):
+                results[i] = translation
+        return results
+    
+    def translate_to_many(self, text: str, target_languages: List[str],
+                          source_language: str = "English", profile: str = None) -> Dict[str, str]:
+        """Translate one text into several targets; M2M100 targets still share one encoding"""
+        routed = OrderedDict()
+        for target in target_languages:
+            routed.setdefault(self._pick(self.backend_for(source_language, target)), []).append(target)
+        
+        translations = {}
+        for name, targets in routed.items():
+            try:
+                with self.pool.use(name) as backend:
+                    translations.update(backend.translate_to_many(text, targets, source_language, profile))
+            except RuntimeError as e:
+                print(f"Error translating to multiple languages: {str(e)}")
+        return {target: translations[target] for target in target_languages if target in translations}
+    
+    def get_language_info(self) -> Dict[str, str]:
+        """Fallback model information plus routes and the model pool's resident models"""
+        return dict(
+            self.fallback.get_language_info(),
+            routes=self.routes,
+            model_pool=self.pool.report()
+        )
+
 
 if __name__ == "__main__":
     # Test the translator
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import CACHE_CONFIG, PATHS
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    """Two-tier translation cache: a bounded in-memory LRU backed by SQLite on disk"""
+
+    def __init__(self, cache_dir: str = None, max_memory_entries: int = None,
+                 max_disk_entries: int = None, ttl_seconds: float = None):
+        self.cache_dir = cache_dir or PATHS['translation_cache']
+        self.db_path = os.path.join(self.cache_dir, CACHE_CONFIG['db_filename'])
+        self.max_memory_entries = max_memory_entries if max_memory_entries is not None else CACHE_CONFIG['max_memory_entries']
+        self.max_disk_entries = max_disk_entries if max_disk_entries is not None else CACHE_CONFIG['max_disk_entries']
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CACHE_CONFIG['ttl_seconds']
+
+        self._memory = OrderedDict()  # key -> (translation, created_at)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, src_lang: str, tgt_lang: str, text: str, decoding_params: Dict) -> str:
+        """Build a cache key from the model, language pair, normalized text and decoding parameters"""
+        payload = json.dumps(
+            [model_name, src_lang, tgt_lang, normalize_text(text), decoding_params],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the on-disk store lazily so constructing the cache costs nothing"""
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON translations(created_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _disk_failed(self, action: str, error: Exception):
+        """Report a disk-tier failure and drop the connection so the next call reconnects"""
+        print(f"Translation cache: could not {action} {self.db_path}: {error}")
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, translation: str, created_at: float):
+        """Insert into the in-memory LRU, evicting the least recently used entries"""
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Look up several keys at once, returning only the hits"""
+        now = time.time()
+        found = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None and not self._is_expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self.memory_hits += 1
+                else:
+                    if entry is not None:
+                        del self._memory[key]
+                    missing.append(key)
+
+            if missing:
+                try:
+                    conn = self._connect()
+                    # Stay well below SQLite's bound-parameter limit
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = conn.execute(
+                            f"SELECT key, translation, created_at FROM translations WHERE key IN ({placeholders})",
+                            chunk
+                        ).fetchall()
+                        for key, translation, created_at in rows:
+                            if self._is_expired(created_at, now):
+                                continue
+                            found[key] = translation
+                            self._remember(key, translation, created_at)
+                            self.disk_hits += 1
+                except (sqlite3.Error, OSError) as e:
+                    # A broken disk tier only costs hits; the remaining keys are misses
+                    self._disk_failed("read", e)
+                self.misses += len(missing) - sum(1 for key in missing if key in found)
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached translation for a key, or None on a miss"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: List[Tuple[str, str]]):
+        """Store several (key, translation) pairs in both tiers"""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for key, translation in items:
+                self._remember(key, translation, now)
+            try:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (key, translation, created_at) VALUES (?, ?, ?)",
+                    [(key, translation, now) for key, translation in items]
+                )
+                conn.commit()
+
+                self._writes_since_prune += len(items)
+                if self._writes_since_prune >= CACHE_CONFIG['prune_interval']:
+                    self._prune(conn, now)
+                    self._writes_since_prune = 0
+            except (sqlite3.Error, OSError) as e:
+                # The memory tier still holds the entries; the disk write is skipped
+                self._disk_failed("write", e)
+
+    def put(self, key: str, translation: str):
+        """Store a single translation"""
+        self.put_many([(key, translation)])
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows and the oldest rows beyond the disk size limit"""
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM translations WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_disk_entries:
+            conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+        conn.commit()
+
+    def prune(self):
+        """Apply TTL and size eviction to the on-disk store now"""
+        with self._lock:
+            try:
+                self._prune(self._connect(), time.time())
+                self._writes_since_prune = 0
+            except (sqlite3.Error, OSError) as e:
+                self._disk_failed("prune", e)
+
+    def clear(self):
+        """Remove every cached translation from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM translations")
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                self._disk_failed("clear", e)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = None
+            if self._conn is not None:
+                try:
+                    disk_entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error as e:
+                    self._disk_failed("count", e)
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries
+            }
+
+    def close(self):
+        """Close the on-disk store"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+
+from config import MODEL_CONFIG, SCHEDULER_CONFIG
+from translate_text import BlockingTranslateMixin, TextTranslator
+
+
+class _PendingRequest:
+    __slots__ = ('text', 'source_language', 'target_language', 'tokens', 'enqueued_at', 'future')
+
+    def __init__(self, text: str, target_language: str, source_language: str, tokens: int):
+        self.text = text
+        self.source_language = source_language
+        self.target_language = target_language
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.future = Future()
+
+
+class TranslationScheduler(BlockingTranslateMixin):
+    """Dynamic micro-batching front end that owns a TextTranslator
+
+    Requests from many threads are queued and packed into one mixed-language
+    batch once either the oldest request has waited ``max_wait_ms`` or the
+    batch reaches ``max_batch_tokens``/``max_batch_size``.
+    """
+
+    def __init__(self, translator: TextTranslator = None, max_wait_ms: float = None,
+                 max_batch_tokens: int = None, max_batch_size: int = None):
+        self.translator = translator or TextTranslator()
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else SCHEDULER_CONFIG['max_wait_ms']) / 1000.0
+        self.max_batch_tokens = max_batch_tokens or SCHEDULER_CONFIG['max_batch_tokens'] or MODEL_CONFIG['max_batch_tokens']
+        self.max_batch_size = max_batch_size or SCHEDULER_CONFIG['max_batch_size']
+
+        self._queue = queue.Queue()
+        self._carry = None  # Request that did not fit in the previous batch
+        self._worker = None
+        self._start_lock = threading.Lock()  # Concurrent first submits must start exactly one worker
+        self._stopping = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._total_wait = 0.0
+        self._max_queue_depth = 0
+
+    def _running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive() and not self._stopping.is_set()
+
+    def start(self):
+        """Start the batching thread, loading the model first if needed"""
+        with self._start_lock:
+            if self._running():
+                return
+            if self._worker is not None:
+                # A worker from a stop() that timed out is still draining; let it finish first
+                self._worker.join()
+            if not self.translator.load_model():
+                raise RuntimeError("Translation model is not available")
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="translation-scheduler", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = None):
+        """Stop accepting work and wait for queued requests to finish"""
+        with self._start_lock:
+            if self._worker is None:
+                return
+            self._stopping.set()
+            self._queue.put(None)
+            self._worker.join(timeout)
+            if not self._worker.is_alive():
+                self._worker = None
+
+    def submit(self, text: str, target_language: str, source_language: str = "English") -> Future:
+        """Queue a translation and return a future resolving to the translated text"""
+        if not self._running():
+            self.start()
+        request = _PendingRequest(text, target_language, source_language, self._estimate_tokens(text))
+        self._queue.put(request)
+        with self._metrics_lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return request.future
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Approximate the padded cost of a request without holding up the caller"""
+        tokenizer = self.translator.tokenizer
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False)) + 2
+        return len(text) // 4 + 2
+
+    def _next_request(self, timeout: float = None):
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        return self._queue.get(timeout=timeout)
+
+    def _collect_batch(self, first: _PendingRequest) -> List[_PendingRequest]:
+        """Grow a batch until the wait window closes or the token/row budget is reached"""
+        batch = [first]
+        tokens = first.tokens
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                if not self._stopping.is_set():
+                    continue  # Stale stop signal left by an earlier worker
+                self._queue.put(None)  # Let the main loop see the stop signal
+                break
+            if tokens + request.tokens > self.max_batch_tokens:
+                self._carry = request
+                break
+            batch.append(request)
+            tokens += request.tokens
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                first = self._next_request(timeout=0.1)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    break
+                continue
+            if first is None:
+                if self._stopping.is_set():
+                    break
+                continue  # Stale stop signal left by an earlier worker
+            self._run_batch(self._collect_batch(first))
+
+    def _run_batch(self, batch: List[_PendingRequest]):
+        started = time.monotonic()
+        try:
+            results = self.translator.translate_mixed(
+                [(request.text, request.source_language, request.target_language) for request in batch],
+                self.max_batch_tokens
+            )
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+        with self._metrics_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._total_wait += sum(started - request.enqueued_at for request in batch)
+
+    def metrics(self) -> Dict[str, float]:
+        """Return queue depth and batching statistics"""
+        with self._metrics_lock:
+            return {
+                'queue_depth': self._queue.qsize() + (1 if self._carry is not None else 0),
+                'max_queue_depth': self._max_queue_depth,
+                'batches': self._batches,
+                'requests': self._requests,
+                'avg_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'avg_queue_wait_ms': 1000.0 * self._total_wait / self._requests if self._requests else 0.0,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'max_batch_tokens': self.max_batch_tokens,
+                'max_batch_size': self.max_batch_size
+            }
@@ -3,8 +3,9 @@ import librosa
 import soundfile as sf
 import numpy as np
 from pydub import AudioSegment
-from typing import Union, Tuple
+from typing import Union, Tuple, Optional
 import tempfile
+from config import AUDIO_CONFIG
 
 def convert_audio_format(input_path: str, output_path: str, target_format: str = "wav") -> bool:
     """Convert audio file to target format"""
@@ -80,24 +81,33 @@ def split_audio_by_duration(audio_path: str, max_duration: float = 10.0) -> list
         print(f"Error splitting audio: {str(e)}")
         return [audio_path]
 
-def validate_audio_file(audio_path: str) -> Tuple[bool, str]:
-    """Validate audio file and return status with message"""
+def validate_audio_file(audio_path: str, max_duration: Optional[float] = AUDIO_CONFIG['max_sample_seconds']) -> Tuple[bool, str]:
+    """Validate audio file and return status with message
+    
+    The duration is read from the file header where possible, so long
+    recordings are not decoded; ``max_duration=None`` accepts any length
+    (streaming enrollment).
+    """
     try:
         if not os.path.exists(audio_path):
             return False, "File does not exist"
         
-        # Try to load with librosa
-        audio, sr = librosa.load(audio_path, sr=None)
+        try:
+            info = sf.info(audio_path)
+            sr, duration = info.samplerate, info.duration
+        except RuntimeError:
+            # Formats libsndfile cannot read (e.g. M4A) are decoded instead
+            audio, sr = librosa.load(audio_path, sr=None)
+            duration = len(audio) / sr
         
-        if len(audio) == 0:
+        if duration == 0:
             return False, "Audio file is empty"
         
-        duration = len(audio) / sr
         if duration < 1.0:
             return False, f"Audio too short: {duration:.2f}s (minimum 1s required)"
         
-        if duration > 30.0:
-            return False, f"Audio too long: {duration:.2f}s (maximum 30s recommended)"
+        if max_duration is not None and duration > max_duration:
+            return False, f"Audio too long: {duration:.2f}s (maximum {max_duration:.0f}s recommended)"
         
         return True, f"Valid audio file: {duration:.2f}s at {sr}Hz"
         
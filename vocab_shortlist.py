@@ -0,0 +1,262 @@
+"""
+Per-target-language vocabulary shortlists for M2M100 decoding.
+A shortlist is built offline from the tokens the full model actually emits for
+a language and stored as JSON. At runtime the output projection only computes
+logits for the shortlist of every target in the batch plus the source tokens;
+every other token gets -inf, so decoding steps skip most of the ~128k-row
+``lm_head`` matmul.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+
+from config import MODEL_CONFIG, PATHS
+
+# The restriction is per calling thread because many threads share one model
+_active = threading.local()
+
+
+def shortlist_path(model_name: str, lang: str) -> str:
+    """File holding a model's shortlist for one target language code"""
+    return os.path.join(PATHS['shortlists_dir'], model_name.replace("/", "--"), f"{lang}.json")
+
+
+class ShortlistLMHead(torch.nn.Module):
+    """Drop-in replacement for ``lm_head`` that can compute logits for a subset of the vocabulary
+
+    Shares the original (tied) weight parameter, so state dicts are unchanged.
+    Without an active restriction on the calling thread it is a plain linear layer.
+    Weight rows sliced for a set of shortlists are kept for reuse by later calls.
+    """
+
+    def __init__(self, linear: torch.nn.Linear):
+        super().__init__()
+        self.weight = linear.weight
+        self.bias = linear.bias
+        self._slices = OrderedDict()  # shortlist key -> (weight rows, bias rows)
+        self._slices_of = None  # (data_ptr, version) of the weight the slices were cut from
+        self._slices_lock = threading.Lock()
+
+    def _slice(self, ids: torch.Tensor) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        return self.weight.index_select(0, ids), None if self.bias is None else self.bias.index_select(0, ids)
+
+    def cached_slice(self, key, ids: torch.Tensor) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        """Weight (and bias) rows for a shortlist, sliced once per key and weight version"""
+        source = (self.weight.data_ptr(), self.weight._version)
+        with self._slices_lock:
+            if self._slices_of != source:
+                # Moved, reloaded or updated weights invalidate every slice
+                self._slices.clear()
+                self._slices_of = source
+            if key in self._slices:
+                self._slices.move_to_end(key)
+                return self._slices[key]
+        rows = self._slice(ids)
+        with self._slices_lock:
+            if self._slices_of == source:
+                self._slices[key] = rows
+                while len(self._slices) > MODEL_CONFIG['shortlist_cached_slices']:
+                    self._slices.popitem(last=False)
+        return rows
+
+    def forward(self, hidden: torch.Tensor) -> torch.Tensor:
+        state = getattr(_active, 'shortlist', None)
+        if state is None or state[0] is not self:
+            return F.linear(hidden, self.weight, self.bias)
+        logits = hidden.new_full((*hidden.shape[:-1], self.weight.shape[0]), -float("inf"))
+        for ids, (weight, bias) in state[1]:
+            logits.index_copy_(-1, ids, F.linear(hidden, weight, bias))
+        return logits
+
+
+def install_shortlist_head(model) -> bool:
+    """Swap the model's output projection for a ShortlistLMHead; False if it cannot be sliced"""
+    head = getattr(model, 'lm_head', None)
+    if isinstance(head, ShortlistLMHead):
+        return True
+    if type(head) is not torch.nn.Linear:
+        return False  # Quantized or exported heads keep the full vocabulary
+    model.lm_head = ShortlistLMHead(head)
+    return True
+
+
+@contextmanager
+def restrict_vocabulary(model, restriction: Optional[Tuple[tuple, torch.Tensor, torch.Tensor]]):
+    """Limit the model's logits to a ``VocabularyShortlists.restriction`` for calls made by this thread"""
+    head = getattr(model, 'lm_head', None)
+    if restriction is None or not isinstance(head, ShortlistLMHead):
+        yield
+        return
+    key, target_ids, extra_ids = restriction
+    target_ids = target_ids.to(head.weight.device)
+    parts = [(target_ids, head.cached_slice(key, target_ids))]
+    if len(extra_ids):
+        # Source tokens outside the shortlists differ per batch and are only a few rows
+        extra_ids = extra_ids.to(head.weight.device)
+        parts.append((extra_ids, head._slice(extra_ids)))
+    previous = getattr(_active, 'shortlist', None)
+    _active.shortlist = (head, parts)
+    try:
+        yield
+    finally:
+        _active.shortlist = previous
+
+
+class VocabularyShortlists:
+    """Lazily loaded shortlists for one model, combined per batch at runtime"""
+
+    def __init__(self, model_name: str, max_fraction: float = None):
+        self.model_name = model_name
+        self.max_fraction = max_fraction if max_fraction is not None else MODEL_CONFIG['shortlist_max_fraction']
+        self._lock = threading.Lock()
+        self._shortlists = {}  # lang -> LongTensor, or None when no shortlist exists
+        self._versions = {}  # lang -> digest of the loaded shortlist's token ids
+        self.restricted_calls = 0
+        self.fallback_calls = 0
+
+    def get(self, lang: str) -> Optional[torch.Tensor]:
+        """Return the token ids of a language's shortlist, or None if none was built"""
+        with self._lock:
+            if lang not in self._shortlists:
+                self._shortlists[lang], self._versions[lang] = self._read(lang)
+            return self._shortlists[lang]
+
+    def version(self, lang: str) -> Optional[str]:
+        """Digest identifying the shortlist loaded for a language, or None if it has none"""
+        self.get(lang)
+        with self._lock:
+            return self._versions[lang]
+
+    def _read(self, lang: str) -> Tuple[Optional[torch.Tensor], Optional[str]]:
+        path = shortlist_path(self.model_name, lang)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable vocabulary shortlist {path}: {e}")
+            return None, None
+        digest = hashlib.sha256(json.dumps(data['token_ids']).encode("utf-8")).hexdigest()[:16]
+        return torch.tensor(data['token_ids'], dtype=torch.long), digest
+
+    def restriction(self, tgt_langs: Iterable[str], source_ids: torch.Tensor,
+                    vocab_size: int) -> Optional[Tuple[tuple, torch.Tensor, torch.Tensor]]:
+        """Token ids a batch may generate, or None to decode over the full vocabulary
+
+        Returns ``(key, target_ids, extra_ids)``: the union of every target's
+        shortlist, identified by ``key`` so its weight rows can be reused, and
+        the batch's source tokens outside it, so names and numbers can still be
+        copied through. Batches with a target that has no shortlist, or whose
+        tokens would cover most of the vocabulary anyway, fall back to the full
+        vocabulary.
+        """
+        langs = sorted(set(tgt_langs))
+        shortlists = [self.get(lang) for lang in langs]
+        restriction = None
+        if shortlists and all(shortlist is not None for shortlist in shortlists):
+            target_ids = torch.cat(shortlists).unique()
+            source = source_ids.flatten().cpu().unique()
+            extra_ids = source[~torch.isin(source, target_ids)]
+            if len(target_ids) + len(extra_ids) <= self.max_fraction * vocab_size:
+                key = tuple((lang, self.version(lang)) for lang in langs)
+                restriction = (key, target_ids, extra_ids)
+        with self._lock:
+            if restriction is None:
+                self.fallback_calls += 1
+            else:
+                self.restricted_calls += 1
+        return restriction
+
+    def stats(self) -> Dict[str, object]:
+        """Return loaded languages and how often batches were restricted or fell back"""
+        with self._lock:
+            return {
+                'languages': sorted(lang for lang, ids in self._shortlists.items() if ids is not None),
+                'restricted_calls': self.restricted_calls,
+                'fallback_calls': self.fallback_calls
+            }
+
+
+def select_tokens(counts: Counter, coverage: float = None, max_tokens: int = None) -> List[int]:
+    """Most frequent token ids until ``coverage`` of all occurrences or ``max_tokens`` ids are reached"""
+    coverage = coverage if coverage is not None else MODEL_CONFIG['shortlist_coverage']
+    max_tokens = max_tokens or MODEL_CONFIG['shortlist_max_tokens']
+    total = sum(counts.values())
+    selected = []
+    covered = 0
+    for token_id, count in counts.most_common(max_tokens):
+        if total and covered / total >= coverage:
+            break
+        selected.append(token_id)
+        covered += count
+    return selected
+
+
+def build_shortlist(tokenizer, texts: Iterable[str], lang: str, model_name: str = None) -> str:
+    """Build and save a shortlist from target-language text (references or model output)"""
+    model_name = model_name or MODEL_CONFIG['translation_model']
+    counts = Counter()
+    for text in texts:
+        counts.update(tokenizer.encode(text, add_special_tokens=False))
+
+    token_ids = sorted(set(select_tokens(counts)) | set(tokenizer.all_special_ids))
+    path = shortlist_path(model_name, lang)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'model_name': model_name,
+            'language': lang,
+            'corpus_tokens': sum(counts.values()),
+            'distinct_tokens': len(counts),
+            'created_at': time.time(),
+            'token_ids': token_ids
+        }, f)
+    os.replace(temp_path, path)
+    print(f"Saved {len(token_ids)}-token shortlist for '{lang}' to {path}")
+    return path
+
+
+def build_shortlists_from_corpus(sentences: List[str], target_languages: List[str],
+                                 source_language: str = "English", translator=None) -> Dict[str, str]:
+    """Translate a source corpus with the full vocabulary and build a shortlist per target from the output"""
+    from translate_text import TextTranslator
+
+    translator = translator or TextTranslator()
+    translator.shortlists = None  # Statistics must come from unrestricted decoding
+    if not translator.load_model():
+        raise RuntimeError("Translation model is not available")
+
+    paths = {}
+    for target in target_languages:
+        lang = translator.language_codes.get(target)
+        if lang is None or target == source_language:
+            continue
+        print(f"Translating {len(sentences)} sentences into {target}...")
+        translations = translator.batch_translate(sentences, target, source_language)
+        paths[target] = build_shortlist(translator.tokenizer, translations, lang, translator.model_name)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python vocab_shortlist.py <english_corpus.txt> [Target Language ...]")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        corpus = [line.strip() for line in f if line.strip()]
+    targets = sys.argv[2:]
+    if not targets:
+        from translate_text import TextTranslator
+        targets = [name for name in TextTranslator().get_supported_languages() if name != "English"]
+    build_shortlists_from_corpus(corpus, targets)